@@ -0,0 +1,85 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import CompactGraph
+
+
+def measure_load(name, load, directory):
+    """
+    Loads the dataset with `load` and reports wall time and the
+    memory still held once loading is done, returning the result.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = load(directory)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>14}: {current / 2 ** 20:>8.1f} MiB held, "
+          f"{peak / 2 ** 20:>8.1f} MiB peak, {elapsed:.3f}s")
+    return data
+
+
+def compare_search(pairs, graph):
+    """
+    Runs every (source, target) pair through each search and
+    reports expanded people and wall time, checking that all
+    of them agree on the degrees of separation.
+    """
+    searches = [
+        ("bfs", degrees.shortest_path),
+        ("bidirectional", degrees.bidirectional_shortest_path),
+        ("compact", graph.shortest_path)
+    ]
+    lengths = {}
+    for name, search in searches:
+        stats = {"expanded": 0}
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = search(source, target, stats)
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                sys.exit(f"{name} disagrees on {source} -> {target}")
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14}: {stats['expanded']:>10} expanded, "
+              f"{elapsed:.3f}s")
+
+
+def main():
+    if len(sys.argv) > 4 or sys.argv[3:] not in [[], ["profile"]]:
+        sys.exit("Usage: python benchmark.py [directory] [pairs] [profile]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    degrees.profiling = len(sys.argv) > 3
+
+    # Timings are inflated by tracemalloc, but comparable between loaders
+    print("Loading data...")
+    measure_load("dicts", degrees.load_data, directory)
+    measure_load("compact", CompactGraph.from_csv, directory)
+
+    # Make sure a snapshot exists, then time mapping it back in
+    CompactGraph.load(directory)
+    graph = measure_load("snapshot", CompactGraph.load, directory)
+    print("Data loaded.")
+
+    # Fixed seed so that runs are comparable with each other
+    rng = random.Random(0)
+    people = sorted(degrees.people)
+    pairs = [(rng.choice(people), rng.choice(people)) for _ in range(count)]
+
+    print(f"Searching {len(pairs)} pairs...")
+    compare_search(pairs, graph)
+
+    if degrees.profiling:
+        print("Allocations:")
+        for name, count in sorted(degrees.allocations.items()):
+            print(f"{name:>14}: {count:>10}")
+        info = degrees.stars_for_movie.cache_info()
+        print(f"{'cache':>14}: {info.hits} hits, {info.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
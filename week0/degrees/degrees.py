@@ -1,7 +1,9 @@
 import csv
 import sys
+from collections import Counter
+from functools import lru_cache
 
-from util import Node, StackFrontier, QueueFrontier
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,6 +14,10 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# When profiling, counts of the objects built while generating neighbors
+profiling = False
+allocations = Counter()
+
 
 def load_data(directory):
     """
@@ -51,11 +57,18 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    # Cached star tuples may belong to previously loaded data
+    stars_for_movie.cache_clear()
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if arg != "--bidirectional"]
+    if len(args) > 1 or len(sys.argv) - len(args) > 2:
+        sys.exit("Usage: python degrees.py [directory] [--bidirectional]")
+    directory = args[0] if args else "large"
+    search = shortest_path
+    if "--bidirectional" in sys.argv:
+        search = bidirectional_shortest_path
 
     # Load data from files into memory
     print("Loading data...")
@@ -69,7 +82,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = search(source, target)
 
     if path is None:
         print("Not connected.")
@@ -84,18 +97,23 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If a `stats` dict is given, the number of expanded people
+    is accumulated under its "expanded" key.
     """
+    if source == target:
+        return []
     
     start = Node(state=source, parent=None, action=None)
   
-    stack = QueueFrontier()
+    stack = DequeQueueFrontier()
     stack.add(start)
     visited = set()
 
@@ -103,7 +121,9 @@ def shortest_path(source, target):
         
         current_node = stack.remove()
         visited.add(current_node.state)
-        neighbors = neighbors_for_person(current_node.state)
+        neighbors = iter_neighbors(current_node.state)
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
         
         for movie_id, actor_id in neighbors:
 
@@ -123,6 +143,91 @@ def shortest_path(source, target):
     return None
 
 
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both
+    ends at once and meeting in the middle.
+
+    Each step expands one whole BFS layer from whichever side has
+    the smaller frontier. Because a full layer is expanded before
+    checking again, the first meeting found is on a shortest path.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a visited person to (previous person, movie_id)
+    forward = {source: (None, None)}
+    backward = {target: (None, None)}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Grow the cheaper side, the co-star relation is symmetric
+        if len(forward_layer) <= len(backward_layer):
+            meeting, forward_layer = expand_layer(
+                forward_layer, forward, backward, stats)
+        else:
+            meeting, backward_layer = expand_layer(
+                backward_layer, backward, forward, stats)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    return None
+
+
+def expand_layer(layer, parents, other_parents, stats=None):
+    """
+    Expands every person in `layer`, recording new people in `parents`.
+
+    Returns a (meeting, next_layer) pair, where meeting is a
+    (person_id, movie_id, person_id) edge joining this side to the
+    other one, or None if the two searches have not met yet.
+    """
+    next_layer = []
+    for person_id in layer:
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
+        for movie_id, neighbor_id in iter_neighbors(person_id):
+            if neighbor_id in other_parents:
+                return (person_id, movie_id, neighbor_id), next_layer
+            if neighbor_id not in parents:
+                parents[neighbor_id] = (person_id, movie_id)
+                next_layer.append(neighbor_id)
+    return None, next_layer
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through a meeting edge
+    found by `bidirectional_shortest_path`.
+    """
+    near, movie_id, far = meeting
+
+    # Work out which end of the meeting edge belongs to the forward search
+    if near not in forward:
+        near, far = far, near
+
+    path = []
+    person_id = near
+    while forward[person_id][0] is not None:
+        previous, action = forward[person_id]
+        path.append((action, person_id))
+        person_id = previous
+    path.reverse()
+
+    path.append((movie_id, far))
+    person_id = far
+    while backward[person_id][0] is not None:
+        following, action = backward[person_id]
+        path.append((action, following))
+        person_id = following
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -154,12 +259,34 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    if profiling:
+        allocations["neighbor_sets"] += 1
+    return set(iter_neighbors(person_id))
+
+
+def iter_neighbors(person_id):
+    """
+    Yields (movie_id, person_id) pairs for people who starred with a
+    given person, one at a time so searches can stop at the target
+    without building the whole neighborhood.
+    """
+    for movie_id in people[person_id]["movies"]:
+        stars = stars_for_movie(movie_id)
+        if profiling:
+            allocations["neighbor_pairs"] += len(stars)
+        for star_id in stars:
+            yield movie_id, star_id
+
+
+@lru_cache(maxsize=4096)
+def stars_for_movie(movie_id):
+    """
+    Returns the person_ids of a movie's stars as a tuple, keeping
+    the most recently used movies cached.
+    """
+    if profiling:
+        allocations["star_tuples"] += 1
+    return tuple(movies[movie_id]["stars"])
 
 
 if __name__ == "__main__":
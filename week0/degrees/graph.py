@@ -0,0 +1,456 @@
+import csv
+import mmap
+import os
+import sys
+from array import array
+
+from util import Node, DequeQueueFrontier
+
+# CSV files a graph is built from
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Snapshot file written next to the CSV files, and its format marker
+SNAPSHOT = "degrees.snapshot"
+MAGIC = b"DEGREES" + sys.byteorder[0].encode()
+
+
+class StringTable():
+    """
+    Sequence of strings packed into one UTF-8 blob, with an array
+    of offsets marking where each string starts and ends.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array("q", [0])
+        parts = []
+        for string in strings:
+            data = string.encode("utf-8")
+            parts.append(data)
+            offsets.append(offsets[-1] + len(data))
+        return cls(b"".join(parts), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class CompactGraph():
+    """
+    Person-movie graph for the degrees dataset with IMDb ids interned
+    to dense integers.
+
+    Starring relations are stored in compressed sparse row form:
+    the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`,
+    and the stars of movie `m` are found the same way through
+    `movie_offsets` and `movie_stars`.
+
+    Every field is a flat array or string table, so a graph can be
+    written to a snapshot file and memory-mapped back unchanged.
+    """
+
+    # Order in which fields are laid out in a snapshot
+    tables = ["person_ids", "names", "births",
+              "movie_ids", "titles", "years"]
+    arrays = ["person_offsets", "person_movies",
+              "movie_offsets", "movie_stars",
+              "person_order", "movie_order", "name_order"]
+
+    def __init__(self, **fields):
+        for field in CompactGraph.tables + CompactGraph.arrays:
+            setattr(self, field, fields[field])
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load the graph for a directory, from its snapshot if that is
+        still up to date, otherwise from CSV files, writing a new
+        snapshot for next time.
+        """
+        stamp = snapshot_stamp(directory)
+        graph = read_snapshot(f"{directory}/{SNAPSHOT}", stamp)
+        if graph is None:
+            graph = cls.from_csv(directory)
+            try:
+                write_snapshot(graph, f"{directory}/{SNAPSHOT}", stamp)
+            except OSError:
+                pass
+        return graph
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Load data from CSV files into a compact graph.
+        """
+        person_index = {}
+        person_ids, names, births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                names.append(row["name"])
+                births.append(row["birth"])
+
+        movie_index = {}
+        movie_ids, titles, years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                titles.append(row["title"])
+                years.append(row["year"])
+
+        # Collect edges, skipping unknown ids and repeated rows
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    edges.add((person_index[row["person_id"]],
+                               movie_index[row["movie_id"]]))
+                except KeyError:
+                    pass
+        edges = array("i", [i for edge in sorted(edges) for i in edge])
+        people = edges[0::2]
+        movies = edges[1::2]
+
+        person_offsets, person_movies = build_csr(
+            len(person_ids), people, movies)
+        movie_offsets, movie_stars = build_csr(
+            len(movie_ids), movies, people)
+
+        # Sorted orders let ids and names be found by binary search
+        person_order = array("i", sorted(
+            range(len(person_ids)), key=person_ids.__getitem__))
+        movie_order = array("i", sorted(
+            range(len(movie_ids)), key=movie_ids.__getitem__))
+        name_order = array("i", sorted(
+            range(len(names)), key=lambda p: names[p].lower()))
+
+        return cls(
+            person_ids=StringTable.from_strings(person_ids),
+            names=StringTable.from_strings(names),
+            births=StringTable.from_strings(births),
+            movie_ids=StringTable.from_strings(movie_ids),
+            titles=StringTable.from_strings(titles),
+            years=StringTable.from_strings(years),
+            person_offsets=person_offsets,
+            person_movies=person_movies,
+            movie_offsets=movie_offsets,
+            movie_stars=movie_stars,
+            person_order=person_order,
+            movie_order=movie_order,
+            name_order=name_order
+        )
+
+    def person(self, person_id):
+        """
+        Returns the integer index of an IMDb person id.
+        """
+        matches = search_sorted(self.person_ids, self.person_order, person_id)
+        if not matches:
+            raise KeyError(person_id)
+        return matches[0]
+
+    def movie(self, movie_id):
+        """
+        Returns the integer index of an IMDb movie id.
+        """
+        matches = search_sorted(self.movie_ids, self.movie_order, movie_id)
+        if not matches:
+            raise KeyError(movie_id)
+        return matches[0]
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDb ids of everyone with the given name,
+        ignoring case.
+        """
+        matches = search_sorted(
+            self.names, self.name_order, name.lower(), str.lower)
+        return [self.person_ids[person] for person in matches]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at index `person`, including themselves.
+        """
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        person_offsets = self.person_offsets
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = self.person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return {
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in self.neighbors(self.person(person_id))
+        }
+
+    def path_indices(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect the source index to the target index.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+        start = Node(state=source, parent=None, action=None)
+        frontier = DequeQueueFrontier()
+        frontier.add(start)
+        visited = {source}
+
+        while not frontier.empty():
+            current_node = frontier.remove()
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for movie, person in self.neighbors(current_node.state):
+                if person == target:
+                    node = Node(target, current_node, movie)
+                    path = []
+                    while node.parent is not None:
+                        path.append((node.action, node.state))
+                        node = node.parent
+                    path.reverse()
+                    return path
+                if person not in visited:
+                    visited.add(person)
+                    frontier.add(Node(person, current_node, movie))
+        return None
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        path = self.path_indices(
+            self.person(source), self.person(target), stats)
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def build_csr(size, rows, columns):
+    """
+    Builds (offsets, indices) arrays in compressed sparse row form
+    for the relation `rows[k] -> columns[k]` over `size` rows.
+    """
+    counts = array("i", bytes(4 * (size + 1)))
+    for row in rows:
+        counts[row + 1] += 1
+    offsets = array("i", counts)
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    # Fill each row's slot range from its starting offset
+    position = array("i", offsets)
+    indices = array("i", bytes(4 * len(rows)))
+    for row, column in zip(rows, columns):
+        indices[position[row]] = column
+        position[row] += 1
+    return offsets, indices
+
+
+def search_sorted(table, order, key, transform=None):
+    """
+    Returns the indices `i` taken from `order` whose `table[i]`
+    (passed through `transform`, if given) equals `key`, where
+    `order` lists the indices of `table` in sorted order.
+    """
+    def value(position):
+        item = table[order[position]]
+        return item if transform is None else transform(item)
+
+    # Binary search for the first match
+    low, high = 0, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        if value(middle) < key:
+            low = middle + 1
+        else:
+            high = middle
+
+    matches = []
+    while low < len(order) and value(low) == key:
+        matches.append(order[low])
+        low += 1
+    return matches
+
+
+def snapshot_stamp(directory):
+    """
+    Returns the (mtime, size) pairs of a directory's CSV files,
+    which a snapshot must match to still be valid.
+    """
+    stamp = array("q")
+    for name in SOURCES:
+        stat = os.stat(f"{directory}/{name}")
+        stamp.extend([stat.st_mtime_ns, stat.st_size])
+    return stamp
+
+
+def write_snapshot(graph, path, stamp):
+    """
+    Writes a graph to a snapshot file.
+
+    The file holds a header of magic bytes, the source stamp and
+    an (offset, length) pair per section, followed by each section
+    aligned to 8 bytes. String tables take two sections, their blob
+    and their offsets.
+    """
+    sections = []
+    for field in CompactGraph.tables:
+        table = getattr(graph, field)
+        sections.extend([bytes(table.blob), table.offsets.tobytes()])
+    for field in CompactGraph.arrays:
+        sections.append(getattr(graph, field).tobytes())
+
+    header = array("q", stamp)
+    position = len(MAGIC) + 8 * (len(stamp) + 2 * len(sections))
+    for section in sections:
+        position = align(position)
+        header.extend([position, len(section)])
+        position += len(section)
+
+    # Write to a temporary file first so readers never see half a snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(header.tobytes())
+        for section in sections:
+            f.write(bytes(align(f.tell()) - f.tell()))
+            f.write(section)
+    os.replace(temporary, path)
+
+
+def read_snapshot(path, stamp):
+    """
+    Memory-maps a graph from a snapshot file.
+
+    Returns None if there is no snapshot, if it was written for CSV
+    files with a different stamp, or if it is damaged.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(data)
+    count = 2 * len(CompactGraph.tables) + len(CompactGraph.arrays)
+    size = len(MAGIC) + 8 * (len(stamp) + 2 * count)
+    if len(data) < size or view[:len(MAGIC)] != MAGIC:
+        return None
+    header = view[len(MAGIC):size].cast("q")
+    if header[:len(stamp)].tolist() != stamp.tolist():
+        return None
+
+    sections = []
+    for i in range(len(stamp), len(header), 2):
+        offset, length = header[i], header[i + 1]
+        if offset < 0 or length < 0 or offset + length > len(data):
+            return None
+        sections.append(view[offset:offset + length])
+
+    # Sections whose length is not a whole number of items are damaged
+    fields = {}
+    try:
+        for i, field in enumerate(CompactGraph.tables):
+            blob, offsets = sections[2 * i], sections[2 * i + 1].cast("q")
+            if len(offsets) == 0 or offsets[-1] != len(blob):
+                return None
+            fields[field] = StringTable(blob, offsets)
+        sections = sections[2 * len(CompactGraph.tables):]
+        for section, field in zip(sections, CompactGraph.arrays):
+            fields[field] = section.cast("i")
+    except TypeError:
+        return None
+    return CompactGraph(**fields)
+
+
+def align(position):
+    return (position + 7) // 8 * 8
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python graph.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    graph = CompactGraph.load(directory)
+    print("Data loaded.")
+
+    source = person_id_for_name(graph, input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = person_id_for_name(graph, input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    path = graph.shortest_path(source, target)
+
+    if path is None:
+        print("Not connected.")
+    else:
+        degrees = len(path)
+        print(f"{degrees} degrees of separation.")
+        path = [(None, source)] + path
+        for i in range(degrees):
+            person1 = graph.names[graph.person(path[i][1])]
+            person2 = graph.names[graph.person(path[i + 1][1])]
+            movie = graph.titles[graph.movie(path[i + 1][0])]
+            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def person_id_for_name(graph, name):
+    """
+    Returns the IMDB id for a person's name,
+    resolving ambiguities as needed.
+    """
+    person_ids = graph.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        return None
+    elif len(person_ids) > 1:
+        print(f"Which '{name}'?")
+        for person_id in person_ids:
+            person = graph.person(person_id)
+            name = graph.names[person]
+            birth = graph.births[person]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        try:
+            person_id = input("Intended Person ID: ")
+            if person_id in person_ids:
+                return person_id
+        except ValueError:
+            pass
+        return None
+    else:
+        return person_ids[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import heapq
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+from graph import CompactGraph, snapshot_stamp
+
+# Index file written next to the CSV files, and its format marker
+INDEX = "degrees.landmarks"
+MAGIC = b"LANDMARK"
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    BFS distances, in degrees of separation, from a few well connected
+    landmark people to everyone else in a `CompactGraph`.
+
+    By the triangle inequality, the distance between two people is at
+    least the difference of their distances to any landmark, and at
+    most the sum of them.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+
+        # One row of `len(graph.person_offsets) - 1` bytes per landmark
+        self.distances = distances
+        self.size = len(graph.person_offsets) - 1
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Builds an index over the `count` people with the most co-stars.
+        """
+        size = len(graph.person_offsets) - 1
+        landmarks = array("i", sorted(
+            range(size), key=lambda p: -co_star_count(graph, p)
+        )[:count])
+        distances = bytearray()
+        for landmark in landmarks:
+            distances += distances_from(graph, landmark)
+        return cls(graph, landmarks, distances)
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Loads the index saved for a directory, or returns None if there
+        is none, the CSV files have changed since it was built, or the
+        file is damaged.
+        """
+        stamp = snapshot_stamp(directory)
+        try:
+            with open(f"{directory}/{INDEX}", "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header = len(MAGIC) + 8 * (len(stamp) + 1)
+        if len(data) < header or data[:len(MAGIC)] != MAGIC:
+            return None
+        fields = array("q", data[len(MAGIC):header])
+        if fields[:len(stamp)] != stamp:
+            return None
+
+        count = fields[-1]
+        size = len(graph.person_offsets) - 1
+        if count < 0 or len(data) < header + 4 * count:
+            return None
+        landmarks = array("i", data[header:header + 4 * count])
+        if any(not 0 <= landmark < size for landmark in landmarks):
+            return None
+        distances = bytearray(data[header + 4 * count:])
+        if len(distances) != count * size:
+            return None
+        return cls(graph, landmarks, distances)
+
+    def save(self, directory):
+        """
+        Saves the index next to a directory's CSV files.
+        """
+        fields = array("q", snapshot_stamp(directory))
+        fields.append(len(self.landmarks))
+
+        # Write to a temporary file first so readers never see half an index
+        path = f"{directory}/{INDEX}"
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(fields.tobytes())
+            f.write(self.landmarks.tobytes())
+            f.write(self.distances)
+        os.replace(temporary, path)
+
+    def distance(self, i, person):
+        """
+        Returns the distance from landmark number `i` to a person.
+        """
+        return self.distances[i * self.size + person]
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person indices. The lower bound is infinite if the
+        two are known to be disconnected, and the upper bound is
+        infinite if no landmark reaches both of them.
+        """
+        if source == target:
+            return 0, 0
+        lower, upper = 1, math.inf
+        for i in range(len(self.landmarks)):
+            a = self.distance(i, source)
+            b = self.distance(i, target)
+            if (a == UNREACHABLE) != (b == UNREACHABLE):
+                return math.inf, math.inf
+            if a != UNREACHABLE:
+                lower = max(lower, abs(a - b))
+                upper = min(upper, a + b)
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function giving, for each person, a lower bound on
+        their distance to `target`, or None if they cannot reach it.
+        """
+        reaching = [
+            (i * self.size, self.distance(i, target))
+            for i in range(len(self.landmarks))
+            if self.distance(i, target) != UNREACHABLE
+        ]
+        distances = self.distances
+
+        def estimate(person):
+            best = 0
+            for row, to_target in reaching:
+                d = distances[row + person]
+                if d == UNREACHABLE:
+                    return None
+                best = max(best, abs(d - to_target))
+            return best
+
+        return estimate
+
+    def path_indices(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect the source to the target, found by A* search guided by
+        landmark bounds.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+
+        estimate = self.heuristic(target)
+        parents = {source: (None, None)}
+        best = {source: 0}
+        frontier = [(estimate(source), 0, source)]
+
+        while frontier:
+            _, cost, person = heapq.heappop(frontier)
+            cost = -cost
+            if cost > best[person]:
+                continue
+            if person == target:
+                path = []
+                while parents[person][0] is not None:
+                    previous, movie = parents[person]
+                    path.append((movie, person))
+                    person = previous
+                path.reverse()
+                return path
+
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for movie, neighbor in self.graph.neighbors(person):
+                if cost + 1 >= best.get(neighbor, math.inf):
+                    continue
+                remaining = estimate(neighbor)
+
+                # Skip people who cannot beat the known upper bound
+                if remaining is None or cost + 1 + remaining > upper:
+                    continue
+                best[neighbor] = cost + 1
+                parents[neighbor] = (person, movie)
+                heapq.heappush(
+                    frontier, (cost + 1 + remaining, -(cost + 1), neighbor))
+        return None
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        graph = self.graph
+        path = self.path_indices(
+            graph.person(source), graph.person(target), stats)
+        if path is None:
+            return None
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+
+
+def co_star_count(graph, person):
+    """
+    Returns the number of (movie, co-star) pairs of a person.
+    """
+    count = 0
+    for i in range(graph.person_offsets[person],
+                   graph.person_offsets[person + 1]):
+        movie = graph.person_movies[i]
+        count += graph.movie_offsets[movie + 1] - graph.movie_offsets[movie]
+    return count
+
+
+def distances_from(graph, source):
+    """
+    Returns a bytearray of BFS distances from a person index to every
+    person, capped below UNREACHABLE.
+    """
+    distances = bytearray([UNREACHABLE]) * (len(graph.person_offsets) - 1)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for _, neighbor in graph.neighbors(person):
+            if distances[neighbor] == UNREACHABLE:
+                distances[neighbor] = distance
+                queue.append(neighbor)
+    return distances
+
+
+def benchmark(index, count):
+    """
+    Compares plain BFS against landmark-guided search on random pairs,
+    reporting how often the bounds alone give the exact answer.
+    """
+    graph = index.graph
+    rng = random.Random(0)
+    size = len(graph.person_offsets) - 1
+    pairs = [(rng.randrange(size), rng.randrange(size)) for _ in range(count)]
+
+    exact = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        lower, upper = index.bounds(source, target)
+        if lower == upper:
+            exact += 1
+    elapsed = time.perf_counter() - start
+    print(f"{'bounds':>10}: {exact}/{count} exact, {elapsed:.3f}s")
+
+    lengths = {}
+    for name, search in [("bfs", graph.path_indices),
+                         ("alt", index.path_indices)]:
+        stats = {"expanded": 0}
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = search(source, target, stats)
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                sys.exit(f"{name} disagrees on {source} -> {target}")
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {stats['expanded']:>10} expanded, "
+              f"{elapsed:.3f}s")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ["build", "benchmark"]:
+        sys.exit("Usage: python landmarks.py build [directory] [landmarks]\n"
+                 "       python landmarks.py benchmark [directory] [pairs]")
+    directory = sys.argv[2] if len(sys.argv) > 2 else "large"
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    print("Loading data...")
+    graph = CompactGraph.load(directory)
+    print("Data loaded.")
+
+    if sys.argv[1] == "build":
+        start = time.perf_counter()
+        index = LandmarkIndex.build(graph, count or 16)
+        index.save(directory)
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {len(index.landmarks)} landmarks in {elapsed:.3f}s.")
+    else:
+        index = LandmarkIndex.load(graph, directory)
+        if index is None:
+            sys.exit("No up to date index, run build first.")
+        benchmark(index, count or 100)
+
+
+if __name__ == "__main__":
+    main()
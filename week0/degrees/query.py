@@ -0,0 +1,164 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socketserver
+import sys
+
+from graph import CompactGraph
+
+# Graph shared by every worker, loaded once before the pool forks
+graph = None
+
+
+def resolve(person):
+    """
+    Returns the IMDb id for a person given as an id or a name,
+    raising ValueError if it is unknown or ambiguous.
+    """
+    try:
+        graph.person(person)
+        return person
+    except KeyError:
+        pass
+    person_ids = graph.person_ids_for_name(person)
+    if len(person_ids) == 0:
+        raise ValueError(f"person not found: {person}")
+    elif len(person_ids) > 1:
+        raise ValueError(
+            f"ambiguous name {person}, use one of: {', '.join(person_ids)}")
+    return person_ids[0]
+
+
+def answer(line):
+    """
+    Answers one query line and returns the response as a JSON line.
+
+    A query is either a JSON object with "source" and "target" keys,
+    or the two people separated by a tab. People may be given by
+    IMDb id or by name.
+    """
+    try:
+        line = line.strip()
+        if line.startswith("{"):
+            query = json.loads(line)
+            source, target = query["source"], query["target"]
+        else:
+            people = line.split("\t")
+            if len(people) != 2:
+                raise ValueError("expected a source and target "
+                                 "separated by a tab")
+            source, target = people
+        source, target = resolve(source), resolve(target)
+    except (ValueError, KeyError, TypeError) as e:
+        return json.dumps({"query": line, "error": str(e)})
+
+    response = {"source": source, "target": target}
+    path = graph.shortest_path(source, target)
+    if path is None:
+        response["degrees"] = None
+        response["path"] = None
+    else:
+        response["degrees"] = len(path)
+        response["path"] = [
+            {
+                "movie": movie_id,
+                "title": graph.titles[graph.movie(movie_id)],
+                "person": person_id,
+                "name": graph.names[graph.person(person_id)]
+            }
+            for movie_id, person_id in path
+        ]
+    return json.dumps(response)
+
+
+def answer_all(lines, pool, output, chunksize):
+    """
+    Writes a response line to `output` for every non-blank query
+    line, in the order the queries were given.
+    """
+    lines = (line for line in lines if line.strip())
+    if pool is None:
+        responses = map(answer, lines)
+    else:
+        responses = pool.imap(answer, lines, chunksize)
+    for response in responses:
+        output.write(response + "\n")
+        output.flush()
+
+
+def serve(path, pool):
+    """
+    Answers queries sent over a Unix socket at `path`, one
+    connection at a time being handled per thread.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode("utf-8") for line in self.rfile)
+            answer_all(lines, pool, Writer(self.wfile), 1)
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+class Writer():
+    """
+    Text interface over a socket's binary write file.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode("utf-8"))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def main():
+    global graph
+
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries as JSON lines.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?",
+                        help="file of queries, stdin if omitted")
+    parser.add_argument("--socket", help="serve queries on a Unix socket")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering queries")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    graph = CompactGraph.load(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    # Forked workers inherit the graph, whose snapshot pages stay shared
+    pool = None
+    if args.workers > 1:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            sys.exit("--workers needs a platform that supports fork")
+        context = multiprocessing.get_context("fork")
+        pool = context.Pool(args.workers)
+
+    try:
+        if args.socket is not None:
+            serve(args.socket, pool)
+        elif args.queries is not None:
+            with open(args.queries, encoding="utf-8") as f:
+                answer_all(f, pool, sys.stdout, 16)
+        else:
+            answer_all(sys.stdin, pool, sys.stdout, 1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
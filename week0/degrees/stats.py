@@ -0,0 +1,134 @@
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter, deque
+
+import degrees
+
+
+def layer_counts(source):
+    """
+    Returns a list whose entry `d` is the number of people at
+    `d` degrees of separation from the source.
+    """
+    layers = [1]
+    seen = {source}
+    layer = [source]
+    while layer:
+        next_layer = []
+        for person_id in layer:
+            for _, neighbor_id in degrees.iter_neighbors(person_id):
+                if neighbor_id not in seen:
+                    seen.add(neighbor_id)
+                    next_layer.append(neighbor_id)
+        if next_layer:
+            layers.append(len(next_layer))
+        layer = next_layer
+    return layers
+
+
+def label_components():
+    """
+    Returns a dict mapping every person_id to the label of its
+    connected component, labels being numbered from 0.
+    """
+    labels = {}
+    label = 0
+    for source in degrees.people:
+        if source in labels:
+            continue
+        labels[source] = label
+        queue = deque([source])
+        while queue:
+            person_id = queue.popleft()
+
+            # Walk movies directly, visiting each movie's stars only once
+            for movie_id in degrees.people[person_id]["movies"]:
+                for star_id in degrees.stars_for_movie(movie_id):
+                    if star_id not in labels:
+                        labels[star_id] = label
+                        queue.append(star_id)
+        label += 1
+    return labels
+
+
+def sample_layers(sources, workers=1):
+    """
+    Returns (source, layer_counts) pairs for many sources, spread
+    over `workers` forked processes that share the loaded data.
+    """
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [(source, layer_counts(source)) for source in sources]
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        return list(zip(sources, pool.map(layer_counts, sources)))
+
+
+def report(count, workers):
+    """
+    Prints component sizes, the distribution of degrees of separation
+    from `count` sampled people, and eccentricity estimates.
+    """
+    start = time.perf_counter()
+    labels = label_components()
+    sizes = Counter(labels.values())
+    print(f"{len(sizes)} components in "
+          f"{time.perf_counter() - start:.3f}s, largest:")
+    for label, size in sizes.most_common(5):
+        print(f"    {size} people")
+
+    if not sizes:
+        return
+
+    # Sample sources from the largest component so layers are comparable
+    largest = sizes.most_common(1)[0][0]
+    people = sorted(p for p, label in labels.items() if label == largest)
+    rng = random.Random(0)
+    sources = rng.sample(people, min(count, len(people)))
+
+    start = time.perf_counter()
+    samples = sample_layers(sources, workers)
+    elapsed = time.perf_counter() - start
+    print(f"Sampled {len(samples)} sources in {elapsed:.3f}s.")
+    if not samples:
+        return
+
+    distribution = Counter()
+    for _, layers in samples:
+        for distance, size in enumerate(layers):
+            if distance:
+                distribution[distance] += size
+    total = sum(distribution.values())
+    print("Degrees of separation:")
+    for distance in sorted(distribution):
+        share = distribution[distance] / total
+        print(f"    {distance}: {share:.2%}")
+
+    # A source's eccentricity is its deepest layer, and any one of them
+    # is a lower bound on the diameter of the component
+    eccentricities = [len(layers) - 1 for _, layers in samples]
+    farthest = max(samples, key=lambda sample: len(sample[1]))[0]
+    print(f"Eccentricity: min {min(eccentricities)}, "
+          f"mean {sum(eccentricities) / len(eccentricities):.2f}, "
+          f"max {max(eccentricities)} (from {farthest})")
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python stats.py [directory] [sources] [workers]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    if count < 1:
+        sys.exit("Sources must be at least 1.")
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    report(count, workers)
+
+
+if __name__ == "__main__":
+    main()
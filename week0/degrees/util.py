@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,50 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a count of the states
+    it holds so that every operation runs in constant time.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.discard(node.state)
+            return node
+
+    def discard(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.discard(node.state)
+            return node
@@ -0,0 +1,166 @@
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def count_nodes(search, board):
+    """
+    Runs `search(board)` and returns its result, the number of boards
+    it generated and its wall time.
+    """
+    nodes = 0
+
+    def counting(function):
+        def wrapper(*args):
+            nonlocal nodes
+            nodes += 1
+            return function(*args)
+        return wrapper
+
+    # Both engines build every child through one function
+    originals = [(ttt, "result", ttt.result),
+                 (bitboard, "place", bitboard.place)]
+    for module, name, function in originals:
+        setattr(module, name, counting(function))
+    try:
+        start = time.perf_counter()
+        value = search(board)
+        elapsed = time.perf_counter() - start
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+    return value, nodes, elapsed
+
+
+def full_tree(board):
+    """
+    Returns the optimal action found by plain minimax, searching
+    every child of every position.
+    """
+    def value(board):
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        scores = [value(ttt.result(board, action))
+                  for action in ttt.actions(board)]
+        return max(scores) if ttt.player(board) == ttt.X else min(scores)
+
+    sign = 1 if ttt.player(board) == ttt.X else -1
+    return max(ttt.actions(board),
+               key=lambda action: sign * value(ttt.result(board, action)))
+
+
+def reachable_positions():
+    """
+    Returns every non-terminal board reachable from the initial state.
+    """
+    positions = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = str(board)
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+
+def score(board):
+    """
+    Returns the exact minimax score of a board.
+    """
+    if ttt.player(board) == ttt.X:
+        return ttt.max_score(board, table=reference)
+    return ttt.min_score(board, table=reference)
+
+
+# Table used only to check the scores of moves chosen by each search
+reference = {}
+
+
+def compare_positions(searches, positions):
+    """
+    Runs every search on every position, checking that it picks a
+    move with the best score, and reports visited nodes and time.
+    """
+    for name, search in searches:
+        nodes = 0
+        slowest = 0
+        start = time.perf_counter()
+        for board in positions:
+            action, count, elapsed = count_nodes(search, board)
+            nodes += count
+            slowest = max(slowest, elapsed)
+            if score(ttt.result(board, action)) != score(board):
+                sys.exit(f"{name} plays {action} badly on {board}")
+        elapsed = time.perf_counter() - start
+        print(f"{name:>16}: {nodes:>8} nodes, {elapsed:.3f}s total, "
+              f"{slowest * 1000:.2f}ms slowest")
+
+
+def node_cost(engine, boards):
+    """
+    Returns the average time the engine takes per node to find the
+    player, expand every action and test the children for a winner.
+    """
+    nodes = 0
+    start = time.perf_counter()
+    for board in boards:
+        engine.player(board)
+        for action in engine.actions(board):
+            child = engine.result(board, action)
+            if not engine.terminal(child):
+                engine.winner(child)
+            nodes += 1
+    return (time.perf_counter() - start) / nodes
+
+
+def compare_engines(positions):
+    """
+    Reports the per-node cost of the list and bitboard engines
+    over the same positions.
+    """
+    engines = [
+        ("lists", ttt, positions),
+        ("bitboards", bitboard, [bitboard.from_board(b) for b in positions])
+    ]
+    for name, engine, boards in engines:
+        cost = node_cost(engine, boards)
+        print(f"{name:>16}: {cost * 1e6:.2f}us per node")
+
+
+def main():
+    if len(sys.argv) > 2 or sys.argv[1:] not in [[], ["all"], ["nodes"]]:
+        sys.exit("Usage: python benchmark.py [all | nodes]")
+    board = ttt.initial_state()
+
+    searches = [
+        ("full tree", full_tree),
+        ("alpha-beta", lambda board: ttt.minimax(
+            board, table=None, ordering=False, book=False)),
+        ("ordered", lambda board: ttt.minimax(
+            board, table=None, ordering=True, book=False)),
+        ("transpositions", lambda board: ttt.minimax(
+            board, table={}, ordering=True, book=False)),
+        ("bitboards", bitboard.board_minimax),
+        ("opening book", ttt.minimax)
+    ]
+    print("First move:")
+    for name, search in searches:
+        action, nodes, elapsed = count_nodes(search, board)
+        print(f"{name:>16}: {nodes:>8} nodes, {elapsed:.3f}s, plays {action}")
+
+    if len(sys.argv) > 1:
+        positions = reachable_positions()
+        print(f"All {len(positions)} reachable positions:")
+        if sys.argv[1] == "all":
+            compare_positions(searches, positions)
+        else:
+            compare_engines(positions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A board is a pair (x, o) of 9-bit integers, where bit 3 * i + j
+is set if that player has a mark in cell (i, j).
+"""
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+FULL = 0b111111111
+
+# Rows, columns and diagonals as bit masks
+lines = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# Whether each set of cells contains a line, and how many cells it has
+has_line = [any(cells & line == line for line in lines)
+            for cells in range(FULL + 1)]
+mark_count = [bin(cells).count("1") for cells in range(FULL + 1)]
+
+# Bit of each cell, and cell of each bit
+cell_bits = {(i, j): 1 << (3 * i + j) for i in range(3) for j in range(3)}
+bit_cells = {bit: cell for cell, bit in cell_bits.items()}
+
+# Scores of positions solved so far, keyed by board
+transposition_table = {}
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the bitboard for a list of lists board.
+    """
+    x = o = 0
+    for cell, bit in cell_bits.items():
+        if board[cell[0]][cell[1]] == X:
+            x |= bit
+        elif board[cell[0]][cell[1]] == O:
+            o |= bit
+    return (x, o)
+
+
+def to_board(board):
+    """
+    Returns the list of lists board for a bitboard.
+    """
+    x, o = board
+    rows = ttt.initial_state()
+    for (i, j), bit in cell_bits.items():
+        if x & bit:
+            rows[i][j] = X
+        elif o & bit:
+            rows[i][j] = O
+    return rows
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if mark_count[board[0]] == mark_count[board[1]] else O
+
+
+def free_bits(board):
+    """
+    Yields the bit of each empty cell on the board.
+    """
+    free = FULL & ~(board[0] | board[1])
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {bit_cells[bit] for bit in free_bits(board)}
+
+
+def place(board, bit):
+    """
+    Returns the board that results from the current player marking
+    the cell at `bit`.
+    """
+    x, o = board
+    if mark_count[x] == mark_count[o]:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    bit = cell_bits[action]
+    if (board[0] | board[1]) & bit:
+        raise RuntimeError("Invalid action on board")
+    return place(board, bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if has_line[board[0]]:
+        return X
+    if has_line[board[1]]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = board
+    return has_line[x] or has_line[o] or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return ttt.utility_map[winner(board)]
+
+
+def score(board, alpha=-1, beta=1):
+    """
+    Returns the score of the board for the player to move, from
+    their own point of view, searched by negamax with alpha-beta
+    pruning. Bounds are memoized as in tictactoe.max_score.
+    """
+    x, o = board
+
+    # The previous player is the only one who can have just won
+    if has_line[x] or has_line[o]:
+        return -1
+    if x | o == FULL:
+        return 0
+
+    lower, upper = transposition_table.get(board, (-1, 1))
+    if lower >= beta or lower == upper:
+        return lower
+    if upper <= alpha:
+        return upper
+    alpha, beta = max(alpha, lower), min(beta, upper)
+
+    window = (alpha, beta)
+    best = -1
+    for bit in free_bits(board):
+        best = max(best, -score(place(board, bit), -beta, -alpha))
+        if best >= beta:
+            break
+        alpha = max(alpha, best)
+
+    if best > window[0]:
+        lower = max(lower, best)
+    if best < window[1]:
+        upper = min(upper, best)
+    transposition_table[board] = (lower, upper)
+    return best
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(board):
+        return None
+
+    best, optimal_bit = -2, None
+    for bit in free_bits(board):
+        this_score = -score(place(board, bit), -1, -best)
+        if this_score > best:
+            best, optimal_bit = this_score, bit
+        if best == 1:
+            break
+    return bit_cells[optimal_bit]
+
+
+def board_minimax(board):
+    """
+    Returns the optimal action for a list of lists board, so the
+    engine can stand in for tictactoe.minimax.
+    """
+    return minimax(from_board(board))
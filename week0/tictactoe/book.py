@@ -0,0 +1,89 @@
+import sys
+
+import tictactoe as ttt
+
+
+def score(board, table):
+    """
+    Returns the minimax score of a board, searched with `table`.
+    """
+    if ttt.player(board) == ttt.X:
+        return ttt.max_score(board, table=table, ordering=True)
+    return ttt.min_score(board, table=table, ordering=True)
+
+
+def positions():
+    """
+    Returns every non-terminal board reachable from the initial state,
+    keyed by its index in the opening book.
+    """
+    found = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index = ttt.book_index(board)
+        if index in found or ttt.terminal(board):
+            continue
+        found[index] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return found
+
+
+def build():
+    """
+    Solves every reachable position and returns the opening book.
+
+    The book has one byte per base 3 board index. The low four bits
+    hold the optimal action as 3 * i + j, the high four bits the
+    score plus one, and 0xFF marks boards that are not in the book.
+    """
+    table = {}
+    book = bytearray([0xFF]) * 3 ** 9
+    for index, board in positions().items():
+        i, j = ttt.minimax(board, table=table, book=False)
+        value = score(board, table)
+        book[index] = (value + 1) << 4 | (3 * i + j)
+    return bytes(book)
+
+
+def verify():
+    """
+    Checks the opening book against search on every reachable
+    position, returning the number of disagreements.
+    """
+    table = {}
+    errors = 0
+    found = positions()
+    for index, board in found.items():
+        entry = ttt.book_entry(board)
+        value = score(board, table)
+        if entry is None:
+            print(f"Missing: {board}")
+            errors += 1
+        elif entry[1] != value or (
+            score(ttt.result(board, entry[0]), table) != value
+        ):
+            print(f"Wrong: {board} plays {entry[0]} for {entry[1]}, "
+                  f"search scores {value}")
+            errors += 1
+    print(f"Checked {len(found)} positions, {errors} disagreements.")
+    return errors
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in ["build", "verify"]:
+        sys.exit("Usage: python book.py build | verify")
+
+    if sys.argv[1] == "build":
+        with open(ttt.book_path, "wb") as f:
+            f.write(build())
+        print(f"Wrote {ttt.book_path}.")
+    elif ttt.book_entry(ttt.initial_state()) is None:
+        sys.exit("No opening book, run build first.")
+    elif verify():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
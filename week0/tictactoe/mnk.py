@@ -0,0 +1,239 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalised to a board of `rows` by `columns` cells,
+won by the first player to get `length` marks in a row. The API
+matches tictactoe.py, so runner.py can play either one.
+"""
+
+import math
+import time
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+# Score of a won position, larger than any heuristic evaluation
+WIN = 1000000
+
+rows, columns, length = 3, 3, 3
+
+# Seconds minimax may spend choosing a move
+time_budget = 1.0
+
+# Every run of `length` cells in a row, column or diagonal
+lines = []
+
+
+def configure(m=3, n=3, k=3, budget=1.0):
+    """
+    Sets the board to m rows by n columns, won with k in a row, and
+    the time budget for minimax in seconds.
+    """
+    global rows, columns, length, time_budget
+    if not 1 <= k <= max(m, n):
+        raise ValueError("win length does not fit on the board")
+    rows, columns, length, time_budget = m, n, k, budget
+
+    lines.clear()
+    for i in range(rows):
+        for j in range(columns):
+            for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if 0 <= end_i < rows and 0 <= end_j < columns:
+                    lines.append([(i + di * s, j + dj * s) for s in range(k)])
+
+
+configure()
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY] * columns for _ in range(rows)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    total = sum(ttt.utility_map[cell] for row in board for cell in row)
+    return X if total == 0 else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j) for i in range(rows) for j in range(columns)
+            if board[i][j] == EMPTY}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    if board[action[0]][action[1]] != EMPTY:
+        raise RuntimeError("Invalid action on board")
+    new_board = [row.copy() for row in board]
+    new_board[action[0]][action[1]] = player(board)
+    return new_board
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for line in lines:
+        first = board[line[0][0]][line[0][1]]
+        if first != EMPTY and all(board[i][j] == first for i, j in line):
+            return first
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    if winner(board) is not None:
+        return True
+    return all(cell != EMPTY for row in board for cell in row)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return ttt.utility_map[winner(board)]
+
+
+def evaluate(board):
+    """
+    Returns a heuristic score of the board from X's point of view.
+
+    Every line still open to only one player counts for that player,
+    ten times more for each mark they already have in it.
+    """
+    score = 0
+    for line in lines:
+        marks = [board[i][j] for i, j in line]
+        xs, os = marks.count(X), marks.count(O)
+        if xs and not os:
+            score += 10 ** xs
+        elif os and not xs:
+            score -= 10 ** os
+    return max(-WIN // 2, min(WIN // 2, score))
+
+
+class Timeout(Exception):
+    pass
+
+
+class Deadline():
+    """
+    Time by which a search must finish, or an event that ends it early.
+    """
+
+    def __init__(self, end, cancel=None):
+        self.end = end
+        self.cancel = cancel
+
+    def check(self):
+        """
+        Raises Timeout if the search is out of time or cancelled.
+        """
+        if time.perf_counter() > self.end or (
+            self.cancel is not None and self.cancel.is_set()
+        ):
+            raise Timeout
+
+
+def minimax(board, cancel=None):
+    """
+    Returns the best action found for the current player on the board
+    within the time budget.
+
+    Searches by iterative deepening, each depth with alpha-beta pruning
+    and a heuristic evaluation at the cutoff, and plays the best action
+    of the deepest search that finished in time. Setting the optional
+    `cancel` event stops the search as if the time had run out.
+    """
+    if terminal(board):
+        return None
+
+    deadline = Deadline(time.perf_counter() + time_budget, cancel)
+    moves = ordered_actions(board)
+    optimal_action = moves[0]
+    empty = len(moves)
+
+    for depth in range(1, empty + 1):
+        try:
+            best_score, action = search_root(board, moves, depth, deadline)
+        except Timeout:
+            break
+        optimal_action = action
+
+        # Search the best move first at the next depth
+        moves.remove(action)
+        moves.insert(0, action)
+
+        # Stop once the game is decided or the whole tree was searched
+        if abs(best_score) >= WIN - empty:
+            break
+    return optimal_action
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions, those nearest the center first.
+    """
+    center = ((rows - 1) / 2, (columns - 1) / 2)
+    return sorted(actions(board), key=lambda action: (
+        abs(action[0] - center[0]) + abs(action[1] - center[1]), action))
+
+
+def search_root(board, moves, depth, deadline):
+    """
+    Returns (score, action) for the best of `moves`, searched to
+    `depth` plies, with the score from the current player's view.
+    """
+    best_score, optimal_action = -math.inf, None
+    for action in moves:
+        this_score = -negamax(result(board, action), depth - 1,
+                              -math.inf, -best_score, deadline, 1)
+        if this_score > best_score:
+            best_score, optimal_action = this_score, action
+    return best_score, optimal_action
+
+
+def negamax(board, depth, alpha, beta, deadline, ply):
+    """
+    Returns the score of the board from the point of view of the
+    player to move, searched to `depth` more plies.
+
+    Wins score WIN less the number of plies taken, so that quicker
+    wins and slower losses are preferred.
+    """
+    deadline.check()
+
+    sign = 1 if player(board) == X else -1
+    if winner(board) is not None:
+        return -(WIN - ply)
+    moves = ordered_actions(board)
+    if not moves:
+        return 0
+    if depth == 0:
+        return sign * evaluate(board)
+
+    best_score = -math.inf
+    for action in moves:
+        best_score = max(best_score, -negamax(
+            result(board, action), depth - 1, -beta, -alpha, deadline,
+            ply + 1))
+        if best_score >= beta:
+            break
+        alpha = max(alpha, best_score)
+    return best_score
@@ -1,9 +1,18 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
+# Larger boards are played by the m,n,k engine
+if len(sys.argv) not in [1, 4]:
+    sys.exit("Usage: python runner.py [rows columns length]")
+if len(sys.argv) == 4:
+    import mnk as ttt
+    ttt.configure(*[int(arg) for arg in sys.argv[1:]])
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,16 +24,51 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches on a worker thread so the window keeps redrawing
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+ai_started = 0
+cancel = threading.Event()
+clock = pygame.time.Clock()
+
+
+def think(board, cancel):
+    """
+    Returns the AI's move for the board, computed on the worker thread.
+    The m,n,k engine stops searching early once `cancel` is set.
+    """
+    if ttt.__name__ == "mnk":
+        return ttt.minimax(board, cancel=cancel)
+    return ttt.minimax(board)
+
+
+def cancel_ai():
+    """
+    Abandons any move the AI is thinking about.
+    """
+    global ai_move, cancel
+    if ai_move is not None:
+        ai_move.cancel()
+        cancel.set()
+        cancel = threading.Event()
+        ai_move = None
+
+
+# Shrink tiles and marks to fit larger boards
+rows, columns = len(board), len(board[0])
+tile_size = min(80, 240 // max(rows, columns))
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60 * tile_size // 80)
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_ai()
+            executor.shutdown(wait=False)
             sys.exit()
 
     screen.fill(black)
@@ -67,13 +111,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (columns / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(columns):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -102,45 +145,48 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (pygame.time.get_ticks() // 300 % 4)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, showing it no sooner than half a second in
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if ai_move is None:
+                ai_move = executor.submit(think, board, cancel)
+                ai_started = time.time()
+            elif ai_move.done() and time.time() - ai_started >= 0.5:
+                move = ai_move.result()
+                ai_move = None
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(columns):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # Offer to play again, or to reset the game while it is going
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        label = "Play Again" if game_over else "Reset"
+        again = mediumFont.render(label, True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                cancel_ai()
+                user = None
+                board = ttt.initial_state()
 
     pygame.display.flip()
+    clock.tick(30)
@@ -3,7 +3,7 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
 
 X = "X"
 O = "O"
@@ -11,6 +11,29 @@ EMPTY = None
 
 utility_map = {X: 1, O: -1, EMPTY: 0}
 
+# Scores of positions solved so far, keyed by canonical board encoding
+transposition_table = {}
+
+# Orders in which to read the 9 cells under each rotation and reflection
+symmetries = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8], [2, 1, 0, 5, 4, 3, 8, 7, 6],
+    [2, 5, 8, 1, 4, 7, 0, 3, 6], [8, 5, 2, 7, 4, 1, 6, 3, 0],
+    [8, 7, 6, 5, 4, 3, 2, 1, 0], [6, 7, 8, 3, 4, 5, 0, 1, 2],
+    [6, 3, 0, 7, 4, 1, 8, 5, 2], [0, 3, 6, 1, 4, 7, 2, 5, 8]
+]
+
+
+# Optimal actions for every position, built by book.py, loaded on first use
+book_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+opening_book = None
+
+# Order in which to try actions: center, then corners, then edges
+action_rank = {
+    (1, 1): 0,
+    (0, 0): 1, (0, 2): 1, (2, 0): 1, (2, 2): 1,
+    (0, 1): 2, (1, 0): 2, (1, 2): 2, (2, 1): 2
+}
+
 
 def initial_state():
     """
@@ -58,7 +81,7 @@ def result(board, action):
         raise RuntimeError("Invalid action on board")
     else:
         player_id = player(board)
-        new_board = copy.deepcopy(board)
+        new_board = [row.copy() for row in board]
         new_board[action[0]][action[1]] = player_id
         return new_board
 
@@ -111,48 +134,175 @@ def utility(board):
     return utility_map[winner(board)]
 
 
-def minimax(board):
+def canonical(board):
+    """
+    Returns a string encoding of the board that is the same for
+    every rotation and reflection of it.
+    """
+    cells = "".join(cell or "-" for row in board for cell in row)
+    return min("".join(cells[i] for i in order) for order in symmetries)
+
+
+def ordered_actions(board):
+    """
+    Returns the actions available on the board, center first,
+    then corners, then edges.
+    """
+    return sorted(actions(board), key=lambda action: action_rank[action])
+
+
+def book_index(board):
+    """
+    Returns the position of the board in the opening book, reading
+    its cells as the digits of a base 3 number.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = 3 * index + (1 if cell == X else 2 if cell == O else 0)
+    return index
+
+
+def book_entry(board):
+    """
+    Returns the (action, score) stored in the opening book for the
+    board, or None if there is no book or the board is not in it.
+    """
+    global opening_book
+    if opening_book is None:
+        try:
+            with open(book_path, "rb") as f:
+                opening_book = f.read()
+        except OSError:
+            opening_book = b""
+
+    index = book_index(board)
+    if index >= len(opening_book) or opening_book[index] == 0xFF:
+        return None
+    entry = opening_book[index]
+    return divmod(entry & 0x0F, 3), (entry >> 4) - 1
+
+
+def minimax(board, table=transposition_table, ordering=True, book=True):
     """
     Returns the optimal action for the current player on the board.
+
+    The action is looked up in the opening book if there is one and
+    `book` is set. Otherwise it is searched for, with scores of
+    positions memoized in `table`, pass None to search the game tree
+    afresh. If `ordering` is set, promising moves are searched first
+    so that more of the tree is pruned.
     """
     if terminal(board):
         return None
 
+    if book:
+        entry = book_entry(board)
+        if entry is not None:
+            return entry[0]
+
     player_id = player(board)
     best_score = -math.inf if player_id == X else math.inf
     optimal_action = None
 
-    for action in actions(board):
+    for action in ordered_actions(board) if ordering else actions(board):
+
+        # Search with the best score so far as the bound to beat
         if player_id == X:
-            this_score = min_score(result(board, action))
+            this_score = min_score(result(board, action), best_score,
+                                   math.inf, table, ordering)
             if this_score > best_score:
                 optimal_action = action
                 best_score = this_score
         else:
-            this_score = max_score(result(board, action))
+            this_score = max_score(result(board, action), -math.inf,
+                                   best_score, table, ordering)
             if this_score < best_score:
                 optimal_action = action
                 best_score = this_score
+
+        # Nothing beats a forced win
+        if best_score == utility_map[player_id]:
+            break
     return optimal_action
 
 
-def max_score(board):
+def max_score(board, alpha=-math.inf, beta=math.inf, table=None,
+              ordering=False):
+    """
+    Returns the score of the board for X to move, searched with
+    alpha-beta pruning.
 
+    A score at or below `alpha` is only an upper bound on the true
+    score, and one at or above `beta` only a lower bound.
+    """
     if terminal(board):
         return utility(board)
 
+    # Symmetric positions share a score, so look up the canonical form
+    if table is not None:
+        key = canonical(board)
+        lower, upper = table.get(key, (-1, 1))
+        if lower >= beta or lower == upper:
+            return lower
+        if upper <= alpha:
+            return upper
+        alpha, beta = max(alpha, lower), min(beta, upper)
+
+    window = (alpha, beta)
     best_score = -math.inf
-    for action in actions(board):
-        best_score = max(best_score, min_score(result(board, action)))
+    for action in ordered_actions(board) if ordering else actions(board):
+        best_score = max(best_score, min_score(
+            result(board, action), alpha, beta, table, ordering))
+        if best_score >= beta or best_score == 1:
+            break
+        alpha = max(alpha, best_score)
+
+    if table is not None:
+        store(table, key, best_score, *window)
     return best_score
 
 
-def min_score(board):
-
+def min_score(board, alpha=-math.inf, beta=math.inf, table=None,
+              ordering=False):
+    """
+    Returns the score of the board for O to move, searched with
+    alpha-beta pruning.
+    """
     if terminal(board):
         return utility(board)
 
+    if table is not None:
+        key = canonical(board)
+        lower, upper = table.get(key, (-1, 1))
+        if upper <= alpha or lower == upper:
+            return upper
+        if lower >= beta:
+            return lower
+        alpha, beta = max(alpha, lower), min(beta, upper)
+
+    window = (alpha, beta)
     best_score = math.inf
-    for action in actions(board):
-        best_score = min(best_score, max_score(result(board, action)))
+    for action in ordered_actions(board) if ordering else actions(board):
+        best_score = min(best_score, max_score(
+            result(board, action), alpha, beta, table, ordering))
+        if best_score <= alpha or best_score == -1:
+            break
+        beta = min(beta, best_score)
+
+    if table is not None:
+        store(table, key, best_score, *window)
     return best_score
+
+
+def store(table, key, score, alpha, beta):
+    """
+    Narrows the (lower, upper) bounds kept in `table` for a position
+    given a score found by searching it in the window (alpha, beta).
+    """
+    lower, upper = table.get(key, (-1, 1))
+    if score > alpha:
+        lower = max(lower, score)
+    if score < beta:
+        upper = min(upper, score)
+    table[key] = (lower, upper)
@@ -0,0 +1,168 @@
+import copy
+import random
+import sys
+import time
+import tracemalloc
+
+import puzzle
+from logic import (And, Implication, Not, Or, Symbol, intern,
+                   interned_sentences, parallel_model_check)
+
+
+def check_nested_add(checkers):
+    """
+    Checks that each entailment checker sees conjuncts added to an And
+    inside the knowledge after it has already been checked once.
+    """
+    a, b, c = Symbol("A"), Symbol("B"), Symbol("C")
+    for name, check in checkers.items():
+        inner = And(Implication(a, b))
+        knowledge = And(inner)
+        answers = [check(knowledge, b)]
+        inner.add(Or(a, c))
+        answers.append(check(knowledge, b))
+        inner.add(Not(c))
+        answers.append(check(knowledge, b))
+        if answers != [False, False, True]:
+            sys.exit(f"{name} misses conjuncts added to a nested And")
+
+
+def time_checkers(checkers, queries, repeat):
+    """
+    Times each entailment checker on every (knowledge, query) pair,
+    repeated `repeat` times, checking that they all agree.
+    """
+    expected = None
+    for name, check in checkers.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            answers = [check(knowledge, query) for knowledge, query in queries]
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = answers
+        elif answers != expected:
+            sys.exit(f"{name} disagrees with {next(iter(checkers))}")
+        print(f"{name:>12}: {elapsed * 1000:>9.2f}ms")
+
+
+def distinct_nodes(sentences):
+    """
+    Returns the number of distinct sentence objects reachable from
+    a list of sentences.
+    """
+    seen = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if id(sentence) in seen:
+            continue
+        seen.add(id(sentence))
+        for name in ["operand", "antecedent", "consequent", "left", "right"]:
+            if hasattr(sentence, name):
+                stack.append(getattr(sentence, name))
+        stack.extend(getattr(sentence, "conjuncts", []))
+        stack.extend(getattr(sentence, "disjuncts", []))
+    return len(seen)
+
+
+def compare_interning(knowledge, repeat):
+    """
+    Reports the objects, memory and hashing time of the knowledge
+    bases as built, against their interned copies.
+
+    Must run before anything else interns the knowledge, so that the
+    interned copies are all made, and measured, here.
+    """
+    interned_sentences.clear()
+    for name, build in [("plain", copy.deepcopy), ("interned", intern)]:
+        tracemalloc.start()
+        sentences = [build(k) for k in knowledge]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for sentence in sentences:
+                hash(sentence)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {distinct_nodes(sentences):>5} nodes, "
+              f"{size / 1024:>7.1f}KiB, hashing {elapsed * 1000:.2f}ms")
+
+
+def synthetic(count, seed=0):
+    """
+    Returns a satisfiable random knowledge base of 3-literal clauses
+    over `count` symbols, with queries that it entails, so that every
+    checker has to rule out all of its models.
+    """
+    rng = random.Random(seed)
+    symbols = [Symbol(f"P{i}") for i in range(count)]
+    hidden = {symbol: rng.random() < 0.5 for symbol in symbols}
+
+    clauses = []
+    while len(clauses) < 3 * count:
+        literals = [symbol if rng.random() < 0.5 else Not(symbol)
+                    for symbol in rng.sample(symbols, 3)]
+
+        # Keep only clauses the hidden model satisfies
+        if any(hidden[literal] if isinstance(literal, Symbol)
+               else not hidden[literal.operand] for literal in literals):
+            clauses.append(Or(*literals))
+
+    knowledge = And(*clauses)
+    queries = [Or(*clause.disjuncts, rng.choice(symbols))
+               for clause in rng.sample(clauses, 4)]
+    return [(knowledge, query) for query in queries]
+
+
+def compare_workers(queries, workers):
+    """
+    Times parallel_model_check on the queries with 1, 2, 4 and so on
+    up to `workers` processes, reporting the speedup over one.
+    """
+    counts = [1 << i for i in range(workers.bit_length())]
+    if counts[-1] != workers:
+        counts.append(workers)
+    baseline = None
+    for count in counts:
+        start = time.perf_counter()
+        for knowledge, query in queries:
+            parallel_model_check(knowledge, query, workers=count)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{count:>4} workers: {elapsed * 1000:>9.2f}ms, "
+              f"{baseline / elapsed:.2f}x")
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [repeat] [symbols] [workers]")
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    knowledge = [puzzle.knowledge0, puzzle.knowledge1,
+                 puzzle.knowledge2, puzzle.knowledge3]
+    queries = [(k, symbol) for k in knowledge for symbol in symbols]
+
+    check_nested_add(puzzle.checkers)
+
+    print(f"Puzzle sentences, hashed x {repeat}:")
+    compare_interning(knowledge, repeat)
+
+    print(f"Puzzles, {len(queries)} queries x {repeat}:")
+    time_checkers(puzzle.checkers, queries, repeat)
+
+    if len(sys.argv) > 2:
+        count = int(sys.argv[2])
+        queries = synthetic(count)
+        print(f"{count} symbols, {len(queries)} queries:")
+        time_checkers(puzzle.checkers, queries, 1)
+
+    if len(sys.argv) > 3:
+        print(f"{count} symbols, enumerated in parallel:")
+        compare_workers(queries, int(sys.argv[3]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import itertools
+import multiprocessing
+import os
+import weakref
 
 
 class Sentence():
@@ -11,10 +14,60 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    # Symbols of the sentence, worked out on first use
+    symbol_cache = None
+
+    # Functions made by compile_sentence for the sentence, by symbols
+    compiled = None
+
+    # The shared copy of the sentence made by `intern`
+    interned_copy = None
+
+    # Number of conjuncts added to any And so far, and its value when
+    # the sentence's caches were filled. Adding to an And changes every
+    # sentence that contains it, which it has no links back to, so the
+    # caches are only trusted while no conjunct has been added since
+    generation = 0
+    cache_generation = 0
+
+    # Whether the sentence is the shared copy made by `intern`, which
+    # must not change and so keeps its hash
+    interned = False
+    hash_cache = None
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
+        self.refresh()
+        if self.symbol_cache is None:
+            self.symbol_cache = frozenset(self.find_symbols())
+        return self.symbol_cache
+
+    def refresh(self):
+        """Empties the caches if an And has been added to since."""
+        if self.interned:
+            return
+        if self.cache_generation != Sentence.generation:
+            self.clear_caches()
+
+    def clear_caches(self):
+        """Empties the caches, which are filled again on use."""
+        self.symbol_cache = None
+        self.compiled = None
+        self.interned_copy = None
+        self.cache_generation = Sentence.generation
+
+    def find_symbols(self):
+        """Returns the symbols in the sentence, without caching."""
         return set()
 
+    def expression(self, index):
+        """
+        Returns Python source for an expression evaluating the sentence
+        in a model packed into the integer `m`, where the symbol named
+        `name` has the truth value of bit `index[name]`.
+        """
+        raise Exception("nothing to compile")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -51,6 +104,8 @@ class Symbol(Sentence):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(("symbol", self.name))
 
     def __repr__(self):
@@ -65,9 +120,15 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
+    def find_symbols(self):
         return {self.name}
 
+    def expression(self, index):
+        try:
+            return f"(m >> {index[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -78,6 +139,8 @@ class Not(Sentence):
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -89,9 +152,12 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
+    def find_symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -103,6 +169,8 @@ class And(Sentence):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -113,10 +181,31 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    # The conjuncts when the caches were filled
+    cached_conjuncts = ()
+
+    def refresh(self):
+        """
+        Empties the caches if an And has been added to since, or if
+        conjuncts were appended to this one without And.add.
+        """
+        if self.interned:
+            return
+        if (self.cache_generation != Sentence.generation
+                or len(self.conjuncts) != len(self.cached_conjuncts)
+                or any(conjunct is not cached for conjunct, cached
+                       in zip(self.conjuncts, self.cached_conjuncts))):
+            self.clear_caches()
+            self.cached_conjuncts = tuple(self.conjuncts)
+
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self.interned:
+            raise Exception("cannot add to an interned sentence")
         self.conjuncts.append(conjunct)
 
+        Sentence.generation += 1
+
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
@@ -126,8 +215,15 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts])
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts) + ")"
 
 
 class Or(Sentence):
@@ -140,6 +236,8 @@ class Or(Sentence):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -157,8 +255,15 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts])
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts) + ")"
 
 
 class Implication(Sentence):
@@ -174,6 +279,8 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
     def __repr__(self):
@@ -188,8 +295,13 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def find_symbols(self):
+        return self.antecedent.symbols() | self.consequent.symbols()
+
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
 
 
 class Biconditional(Sentence):
@@ -205,6 +317,8 @@ class Biconditional(Sentence):
                 and self.right == other.right)
 
     def __hash__(self):
+        if self.hash_cache is not None:
+            return self.hash_cache
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
     def __repr__(self):
@@ -221,8 +335,125 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def find_symbols(self):
+        return self.left.symbols() | self.right.symbols()
+
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+
+# Shared sentences made by `intern`, keyed by their class and the
+# identities of their interned parts. A sentence is dropped once nothing
+# else refers to it, and its parts stay alive for as long as it does,
+# so no identity in a key can be reused by another object
+interned_sentences = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """
+    Returns the one shared sentence structurally equal to `sentence`,
+    so that equal subformulas are a single object with a cached hash.
+
+    The copy is kept on the sentence, and made again only once the
+    sentence has changed.
+    """
+    if sentence.interned:
+        return sentence
+    sentence.refresh()
+    if sentence.interned_copy is not None:
+        return sentence.interned_copy
+
+    if isinstance(sentence, Symbol):
+        key = (Symbol, sentence.name)
+        parts = [sentence.name]
+    elif isinstance(sentence, Not):
+        parts = [intern(sentence.operand)]
+    elif isinstance(sentence, And):
+        parts = [intern(conjunct) for conjunct in sentence.conjuncts]
+    elif isinstance(sentence, Or):
+        parts = [intern(disjunct) for disjunct in sentence.disjuncts]
+    elif isinstance(sentence, Implication):
+        parts = [intern(sentence.antecedent), intern(sentence.consequent)]
+    elif isinstance(sentence, Biconditional):
+        parts = [intern(sentence.left), intern(sentence.right)]
+    else:
+        raise TypeError("must be a logical sentence")
+    if not isinstance(sentence, Symbol):
+        key = (type(sentence), tuple(id(part) for part in parts))
+
+    shared = interned_sentences.get(key)
+    if shared is None:
+        shared = type(sentence)(*parts)
+        shared.hash_cache = hash(shared)
+        shared.interned = True
+        interned_sentences[key] = shared
+    sentence.interned_copy = shared
+    return shared
+
+
+def evaluate_shared(sentence, model, index, memo):
+    """
+    Evaluates an interned sentence in a model packed into an integer,
+    where the symbol named `name` is bit `index[name]`.
+
+    A subformula's value depends only on the bits of its own symbols,
+    so `memo` keeps, for each subformula by identity, its values by
+    those bits, and is meant to be shared by every model checked.
+    Subformulas over few symbols are then evaluated only a few times
+    however many models there are.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return model >> index[sentence.name] & 1 == 1
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+
+    entry = memo.get(id(sentence))
+    if entry is None:
+        mask = 0
+        for name in sentence.symbols():
+            mask |= 1 << index[name]
+        entry = memo[id(sentence)] = (mask, {})
+    mask, values = entry
+    value = values.get(model & mask)
+    if value is not None:
+        return value
+
+    if isinstance(sentence, Not):
+        value = not evaluate_shared(sentence.operand, model, index, memo)
+    elif isinstance(sentence, And):
+        value = all(evaluate_shared(conjunct, model, index, memo)
+                    for conjunct in sentence.conjuncts)
+    elif isinstance(sentence, Or):
+        value = any(evaluate_shared(disjunct, model, index, memo)
+                    for disjunct in sentence.disjuncts)
+    elif isinstance(sentence, Implication):
+        value = (not evaluate_shared(sentence.antecedent, model, index, memo)
+                 or evaluate_shared(sentence.consequent, model, index, memo))
+    else:
+        value = (evaluate_shared(sentence.left, model, index, memo)
+                 == evaluate_shared(sentence.right, model, index, memo))
+    values[model & mask] = value
+    return value
+
+
+def shared_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, interning both first and
+    remembering each subformula's value for every assignment of its
+    own symbols, across all the models enumerated.
+    """
+    knowledge, query = intern(knowledge), intern(query)
+    symbols = sorted(set(knowledge.symbols()) | query.symbols())
+    index = {name: i for i, name in enumerate(symbols)}
+    memo = {}
+    for model in range(1 << len(symbols)):
+        if (evaluate_shared(knowledge, model, index, memo)
+                and not evaluate_shared(query, model, index, memo)):
+            return False
+    return True
 
 
 def model_check(knowledge, query):
@@ -257,7 +488,467 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols()) | query.symbols()
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class CNF():
+    """
+    Conjunctive normal form formula over integer variables.
+
+    Sentences are added by the Tseitin transformation, which gives
+    every compound subformula a fresh variable defined by a few
+    clauses, so the formula grows linearly with the sentences added
+    and is satisfiable exactly when they all can be true together.
+    A clause is a list of literals, a literal being a variable
+    number, or its negation for a negated variable.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+
+        # Literal already defined for each subformula
+        self.literals = {}
+
+    def variable(self, name=None):
+        """
+        Returns the variable for a symbol name, or a fresh one.
+        """
+        if name is None:
+            self.count += 1
+            return self.count
+        if name not in self.variables:
+            self.variables[name] = self.variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """
+        Adds the clauses needed for `sentence` to be true.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when `sentence` is,
+        adding clauses defining it as needed.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        t = self.variable()
+        if isinstance(sentence, And):
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            self.clauses.extend([-t, part] for part in parts)
+            self.clauses.append([t] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            self.clauses.extend([t, -part] for part in parts)
+            self.clauses.append([-t] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            self.clauses.extend([[-t, -a, b], [t, a], [t, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-t, -a, b], [-t, a, -b],
+                                 [t, a, b], [t, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.literals[sentence] = t
+        return t
+
+    def solve(self):
+        """
+        Returns a satisfying model, mapping symbol names to truth
+        values, or None if the formula is unsatisfiable.
+        """
+        assignment = DPLL(self.clauses, self.count).solve()
+        if assignment is None:
+            return None
+        return {name: assignment[v] > 0 for name, v in self.variables.items()}
+
+
+class DPLL():
+    """
+    DPLL satisfiability solver with unit propagation over two
+    watched literals per clause, backtracking chronologically.
+    """
+
+    def __init__(self, clauses, count):
+        self.clauses = []
+        self.units = []
+        self.conflict = False
+
+        # Value of each variable: 1 true, -1 false, 0 unassigned
+        self.assignment = [0] * (count + 1)
+
+        # Clauses watching each literal, which must not be false
+        # while another literal of the clause is unassigned
+        self.watches = {}
+        for literal in range(1, count + 1):
+            self.watches[literal] = []
+            self.watches[-literal] = []
+
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.conflict = True
+            elif len(clause) == 1:
+                self.units.append(clause[0])
+            else:
+                self.watches[clause[0]].append(len(self.clauses))
+                self.watches[clause[1]].append(len(self.clauses))
+                self.clauses.append(clause)
+
+        # Assigned literals in order, and how many have been propagated
+        self.trail = []
+        self.head = 0
+
+    def value(self, literal):
+        value = self.assignment[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal):
+        self.assignment[abs(literal)] = 1 if literal > 0 else -1
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning False
+        on a conflict.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            keep = []
+            for k, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the falsified watch in second place
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    keep.append(index)
+                    continue
+
+                # Move the watch to any literal that is not false
+                for i in range(2, len(clause)):
+                    if self.value(clause[i]) != -1:
+                        clause[1], clause[i] = clause[i], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    keep.append(index)
+                    if self.value(clause[0]) == -1:
+                        keep.extend(watching[k + 1:])
+                        self.watches[false] = keep
+                        return False
+                    if self.value(clause[0]) == 0:
+                        self.assign(clause[0])
+            self.watches[false] = keep
+        return True
+
+    def solve(self):
+        """
+        Returns a list of variable values, 1 for true and -1 for false,
+        indexed by variable, or None if the clauses are unsatisfiable.
+        """
+        if self.conflict:
+            return None
+        for literal in self.units:
+            if self.value(literal) == -1:
+                return None
+            if self.value(literal) == 0:
+                self.assign(literal)
+
+        # Decisions as (trail position, literal, already flipped)
+        decisions = []
+        while True:
+            if not self.propagate():
+
+                # Flip the latest decision that has not been flipped yet
+                while decisions and decisions[-1][2]:
+                    decisions.pop()
+                if not decisions:
+                    return None
+                position, literal, _ = decisions.pop()
+                for assigned in self.trail[position:]:
+                    self.assignment[abs(assigned)] = 0
+                del self.trail[position:]
+                self.head = position
+                decisions.append((position, -literal, True))
+                self.assign(-literal)
+                continue
+
+            try:
+                variable = self.assignment.index(0, 1)
+            except ValueError:
+                return [1 if value >= 0 else -1 for value in self.assignment]
+            decisions.append((len(self.trail), variable, False))
+            self.assign(variable)
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles a sentence into a function taking a model packed into an
+    integer, where the symbol named `symbols[i]` is bit `i`, and
+    returning whether the sentence is true in that model.
+
+    The function is kept on the sentence, to be reused whenever it is
+    compiled for the same symbols again.
+    """
+    symbols = tuple(symbols)
+    sentence.refresh()
+    if sentence.compiled is None:
+        sentence.compiled = {}
+    if symbols not in sentence.compiled:
+        index = {name: i for i, name in enumerate(symbols)}
+        sentence.compiled[symbols] = eval(
+            f"lambda m: bool({sentence.expression(index)})")
+    return sentence.compiled[symbols]
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, enumerating models as
+    integers and evaluating compiled sentences in each of them.
+    """
+    symbols = sorted(set(knowledge.symbols()) | query.symbols())
+    knowledge = compile_sentence(knowledge, symbols)
+    query = compile_sentence(query, symbols)
+    for model in range(1 << len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
+
+
+def evaluate_columns(sentence, columns, size, np):
+    """
+    Evaluates a sentence over `size` models at once, where `columns`
+    maps each symbol name to a NumPy boolean array of its values,
+    returning the array of the sentence's values.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return columns[sentence.name]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    if isinstance(sentence, Not):
+        return ~evaluate_columns(sentence.operand, columns, size, np)
+    if isinstance(sentence, And):
+        values = np.ones(size, dtype=bool)
+        for conjunct in sentence.conjuncts:
+            values &= evaluate_columns(conjunct, columns, size, np)
+        return values
+    if isinstance(sentence, Or):
+        values = np.zeros(size, dtype=bool)
+        for disjunct in sentence.disjuncts:
+            values |= evaluate_columns(disjunct, columns, size, np)
+        return values
+    if isinstance(sentence, Implication):
+        return (~evaluate_columns(sentence.antecedent, columns, size, np)
+                | evaluate_columns(sentence.consequent, columns, size, np))
+    if isinstance(sentence, Biconditional):
+        return (evaluate_columns(sentence.left, columns, size, np)
+                == evaluate_columns(sentence.right, columns, size, np))
+    raise TypeError("must be a logical sentence")
+
+
+def vectorized_model_check(knowledge, query, chunk=1 << 16):
+    """
+    Checks if knowledge base entails query, evaluating both over a
+    truth table built with NumPy, `chunk` rows at a time so memory
+    stays bounded however many symbols there are.
+    """
+    import numpy as np
+
+    symbols = sorted(set(knowledge.symbols()) | query.symbols())
+    total = 1 << len(symbols)
+    for start in range(0, total, chunk):
+        models = np.arange(start, min(start + chunk, total), dtype=np.int64)
+
+        # Symbol i is true in the models whose bit i is set
+        columns = {}
+        for i, name in enumerate(symbols):
+            columns[name] = (models >> i & 1).astype(bool)
+
+        size = len(models)
+        if np.any(evaluate_columns(knowledge, columns, size, np)
+                  & ~evaluate_columns(query, columns, size, np)):
+            return False
+    return True
+
+
+def dpll_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking that the
+    knowledge base together with the query's negation has no model.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return cnf.solve() is None
+
+
+class KnowledgeBase():
+    """
+    A conjunction of sentences, kept together with every model that
+    satisfies it, so that many queries are answered by one enumeration.
+
+    Models are packed into integers as by compile_sentence, the symbol
+    named `symbols[i]` being bit `i`. Symbols new to the knowledge base
+    take the next bits, so the models found so far stay valid.
+    """
+
+    def __init__(self, *sentences):
+        self.symbols = []
+        self.models = [0]
+        self.answers = {}
+        for sentence in sentences:
+            self.add(sentence)
+
+    def extend(self, names, sentence=None):
+        """
+        Adds symbols to the knowledge base, free to take either value,
+        keeping only the models in which `sentence` is true, if given.
+        """
+        known = set(self.symbols)
+        names = sorted(name for name in names if name not in known)
+        count = len(self.symbols)
+        self.symbols.extend(names)
+
+        check = None
+        if sentence is not None:
+            check = compile_sentence(sentence, self.symbols)
+        self.models = [
+            model
+            for extra in range(1 << len(names))
+            for model in (base | extra << count for base in self.models)
+            if check is None or check(model)
+        ]
+
+    def add(self, sentence):
+        """
+        Adds a sentence to the knowledge base, dropping the models in
+        which it is false.
+        """
+        Sentence.validate(sentence)
+        self.extend(sentence.symbols(), sentence)
+        self.answers.clear()
+
+    def satisfiable(self):
+        """Returns whether the knowledge base has any model."""
+        return len(self.models) > 0
+
+    def entails(self, query):
+        """
+        Checks if the knowledge base entails query, remembering the
+        answer until another sentence is added.
+        """
+        Sentence.validate(query)
+        if query not in self.answers:
+            if not query.symbols() <= set(self.symbols):
+                self.extend(query.symbols())
+            check = compile_sentence(query, self.symbols)
+            self.answers[query] = all(check(model) for model in self.models)
+        return self.answers[query]
+
+
+# KnowledgeBases made by cached_model_check, keyed by the interned
+# knowledge they were made from, and how many of them to keep
+knowledge_bases = {}
+knowledge_base_limit = 32
+
+
+def cached_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, against a KnowledgeBase
+    kept for an interned snapshot of the knowledge.
+
+    The snapshot is reused until the knowledge changes, through And.add
+    anywhere in it or conjuncts appended to it directly, and a changed
+    knowledge gets a new snapshot and a new KnowledgeBase rather than
+    stale answers. To add sentences to a knowledge base incrementally,
+    hold a KnowledgeBase directly.
+    """
+    snapshot = intern(knowledge)
+    knowledge_base = knowledge_bases.get(snapshot)
+    if knowledge_base is None:
+        if len(knowledge_bases) >= knowledge_base_limit:
+            knowledge_bases.clear()
+        knowledge_base = knowledge_bases[snapshot] = KnowledgeBase(snapshot)
+    return knowledge_base.entails(intern(query))
+
+
+# What parallel_model_check's forked workers check: the compiled
+# knowledge and query, how many symbols each sub-space fixes, how many
+# are left free, and the event set once a counter-model is found
+parallel_task = None
+
+
+def check_subspace(prefix):
+    """
+    Checks that the query holds in every model of the knowledge whose
+    fixed symbols take the bits of `prefix`, giving up early once any
+    worker has found a counter-model.
+    """
+    knowledge, query, fixed, free, found = parallel_task
+    for rest in range(1 << free):
+        if rest & 0xfff == 0 and found.is_set():
+            return True
+        model = prefix | rest << fixed
+        if knowledge(model) and not query(model):
+            found.set()
+            return False
+    return True
+
+
+def parallel_model_check(knowledge, query, workers=None, fixed=None):
+    """
+    Checks if knowledge base entails query, splitting the models into
+    sub-spaces by the values of the first `fixed` symbols and checking
+    them in a pool of `workers` forked processes.
+
+    By default there are as many workers as CPUs, and enough symbols
+    are fixed to give each worker about four sub-spaces.
+    """
+    global parallel_task
+    workers = workers or os.cpu_count() or 1
+    symbols = sorted(set(knowledge.symbols()) | query.symbols())
+    if fixed is None:
+        fixed = (4 * workers - 1).bit_length()
+    fixed = min(fixed, len(symbols))
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return compiled_model_check(knowledge, query)
+
+    # Compile before forking, so that every worker inherits the functions
+    context = multiprocessing.get_context("fork")
+    parallel_task = (compile_sentence(knowledge, symbols),
+                     compile_sentence(query, symbols),
+                     fixed, len(symbols) - fixed, context.Event())
+    pool = context.Pool(workers)
+    try:
+        return all(pool.imap_unordered(check_subspace, range(1 << fixed)))
+    finally:
+
+        # Let the workers see the event and wind down, since terminating
+        # one while it holds a lock would hang the others
+        pool.close()
+        pool.join()
+        parallel_task = None
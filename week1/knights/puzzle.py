@@ -1,3 +1,5 @@
+import sys
+
 from logic import *
 
 AKnight = Symbol("A is a Knight")
@@ -77,7 +79,22 @@ knowledge3 = And(
 )
 
 
+# Ways of checking entailment, which must all give the same answers
+checkers = {
+    "enumerate": model_check,
+    "compiled": compiled_model_check,
+    "shared": shared_model_check,
+    "vectorized": vectorized_model_check,
+    "dpll": dpll_model_check,
+    "cached": cached_model_check
+}
+
+
 def main():
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] not in checkers):
+        sys.exit(f"Usage: python puzzle.py [{' | '.join(checkers)}]")
+    check = checkers[sys.argv[1] if len(sys.argv) > 1 else "enumerate"]
+
     symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
     puzzles = [
         ("Puzzle 0", knowledge0),
@@ -91,7 +108,7 @@ def main():
             print("    Not yet implemented.")
         else:
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if check(knowledge, symbol):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,113 @@
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from probability import MineProbabilities
+
+# Steps the probability search may take a move. Games are limited by
+# work rather than time, so that a seed always replays the same game
+work_budget = 100000
+
+
+def play(height, width, mines, seed):
+    """
+    Plays one game with the AI, as the runner's AI button would.
+
+    Returns (won, latencies, inferences, random_moves, fallbacks,
+    sentences): the seconds each move took to choose and learn from,
+    the seconds of those spent in add_knowledge, how many moves were
+    random, how many of those ran out of work and fell back to an
+    estimate, and the number of sentences known at the end.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    ai.probabilities = MineProbabilities(
+        mines, time_budget=None, work_budget=work_budget)
+    safe_cells = height * width - mines
+    latencies, inferences = [], []
+    random_moves = 0
+
+    won = True
+    while len(ai.moves_made) < safe_cells:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            random_moves += 1
+        if move is None or game.is_mine(move):
+            won = False
+            break
+        learning = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        end = time.perf_counter()
+        latencies.append(end - start)
+        inferences.append(end - learning)
+    fallbacks = ai.probabilities.fallbacks
+    return (won, latencies, inferences, random_moves, fallbacks,
+            len(ai.knowledge))
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at `fraction` of the way through sorted values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(height, width, mines, games):
+    """
+    Prints the move latency of the AI over `games` seeded games, how
+    it changes from the start to the end of a game, and how often the
+    AI had to guess.
+    """
+    wins = 0
+    latencies, inferences = [], []
+    early, late = [], []
+    guesses = estimates = 0
+    sentences = 0
+    for seed in range(games):
+        won, moves, learned, random_moves, fallbacks, known = play(
+            height, width, mines, seed)
+        estimates += fallbacks
+        wins += won
+        latencies.extend(moves)
+        inferences.extend(learned)
+        tenth = max(1, len(moves) // 10)
+        early.extend(moves[:tenth])
+        late.extend(moves[-tenth:])
+        guesses += random_moves
+        sentences = max(sentences, known)
+
+    latencies.sort()
+    total = sum(latencies)
+    print(f"{height}x{width} with {mines} mines, {games} games, "
+          f"{wins} won, {len(latencies)} moves in {total:.2f}s")
+    print(f"    {len(latencies) / total:.0f} moves/s, "
+          f"at most {sentences} sentences known")
+    print(f"    {guesses} random moves, "
+          f"{guesses / (len(latencies) + games - wins):.2%} of all moves, "
+          f"{estimates} estimated")
+    for name, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]:
+        print(f"    {name}: {percentile(latencies, fraction) * 1e6:.0f}us")
+    print(f"    max: {latencies[-1] * 1e6:.0f}us")
+    print(f"    inference: {sum(inferences) / len(inferences) * 1e6:.0f}us "
+          f"mean per move")
+    print(f"    first tenth of moves: "
+          f"{sum(early) / len(early) * 1e6:.0f}us mean, "
+          f"last tenth: {sum(late) / len(late) * 1e6:.0f}us mean")
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 4, 5]:
+        sys.exit("Usage: python benchmark.py [height width mines] [games]")
+    height, width, mines = 100, 100, 1000
+    if len(sys.argv) >= 4:
+        height, width, mines = [int(arg) for arg in sys.argv[1:4]]
+    games = int(sys.argv[-1]) if len(sys.argv) in [2, 5] else 10
+    report(height, width, mines, games)
+
+
+if __name__ == "__main__":
+    main()
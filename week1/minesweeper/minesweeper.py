@@ -1,6 +1,8 @@
 import itertools
 import random
 
+from probability import MineProbabilities
+
 
 class Minesweeper():
     """
@@ -12,27 +14,49 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Cell (i, j) is byte i * width + j of the board, 1 for a mine
+        self.board = bytearray(height * width)
+
+        # Add mines randomly, all drawn at once
+        positions = random.sample(range(height * width), mines)
+        self.mines = set()
+        for position in positions:
+            self.board[position] = 1
+            self.mines.add(divmod(position, width))
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Count the mines around every cell once
+        self.counts = self.count_neighbors()
 
         # At first, player has found no mines
         self.mines_found = set()
 
+    def count_neighbors(self):
+        """
+        Returns a bytearray laid out like the board, holding the number
+        of mines next to each cell.
+
+        Sums the shifted board with NumPy if it is installed, and
+        otherwise adds each mine to the counts of its neighbors.
+        """
+        height, width = self.height, self.width
+        try:
+            import numpy as np
+        except ImportError:
+            counts = bytearray(height * width)
+            for i, j in self.mines:
+                for ni in range(max(0, i - 1), min(height, i + 2)):
+                    for nj in range(max(0, j - 1), min(width, j + 2)):
+                        if (ni, nj) != (i, j):
+                            counts[ni * width + nj] += 1
+            return counts
+
+        board = np.frombuffer(self.board, dtype=np.uint8).reshape(height, width)
+        padded = np.pad(board, 1)
+        counts = sum(padded[1 + di:1 + di + height, 1 + dj:1 + dj + width]
+                     for di in (-1, 0, 1) for dj in (-1, 0, 1)) - board
+        return bytearray(counts.astype(np.uint8).tobytes())
+
     def print(self):
         """
         Prints a text-based representation
@@ -41,7 +65,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i * self.width + j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -50,7 +74,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i * self.width + j])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +82,8 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return self.counts[i * self.width + j]
 
     def won(self):
         """
@@ -98,6 +106,9 @@ class Sentence():
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((frozenset(self.cells), self.count))
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
@@ -142,12 +153,25 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, work_limit=20000, mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # With the number of mines known, random moves go where a mine
+        # is least likely
+        self.probabilities = None
+        if mines is not None:
+            self.probabilities = MineProbabilities(mines)
+
+        # Sentences still to infer from, keyed by identity as their
+        # hashes change while they wait, and the most sentences and
+        # comparisons to look at in one move before leaving the rest
+        # for the next
+        self.pending = {}
+        self.work_limit = work_limit
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -155,8 +179,10 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true, and the
+        # sentences that mention each cell
+        self.knowledge = set()
+        self.index = {}
 
         # Generate all possible cells
         self.all_cells = set()
@@ -165,14 +191,42 @@ class MinesweeperAI():
             self.all_cells.add(i)
 
 
+    def learn(self, sentence):
+        """
+        Adds a sentence to the knowledge base and the index of every
+        cell it mentions, unless it is empty or already known.
+        Returns whether the sentence was added.
+        """
+        if not sentence.cells or sentence in self.knowledge:
+            return False
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.index.setdefault(cell, set()).add(sentence)
+        self.pending[id(sentence)] = sentence
+        return True
+
+    def forget(self, sentence):
+        """
+        Removes a sentence from the knowledge base and the index,
+        which must be done before the sentence changes its hash.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.index[cell]
+            sentences.discard(sentence)
+            if not sentences:
+                del self.index[cell]
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in list(self.index.get(cell, ())):
+            self.forget(sentence)
             sentence.mark_mine(cell)
+            self.learn(sentence)
 
     def mark_safe(self, cell):
         """
@@ -180,8 +234,10 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for sentence in list(self.index.get(cell, ())):
+            self.forget(sentence)
             sentence.mark_safe(cell)
+            self.learn(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -197,9 +253,12 @@ class MinesweeperAI():
                if it can be concluded based on the AI's knowledge base
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
+
+        Conclusions are propagated by `infer` until nothing more
+        follows, or until the work limit for the move is reached.
         """
         self.moves_made.add(cell)
-        self.safes.add(cell)
+        self.mark_safe(cell)
 
         # Keep count of nearby mines and counts
         new_sentence_cells = set()
@@ -212,32 +271,54 @@ class MinesweeperAI():
                 if (i, j) == cell:
                     continue
 
-                # Update count if cell in bounds and is mine
+                # Leave out cells already known, counting known mines
                 if 0 <= i < self.height and 0 <= j < self.width:
-                    if (i, j) not in self.moves_made:
+                    if (i, j) in self.mines:
+                        count -= 1
+                    elif (i, j) not in self.safes:
                         new_sentence_cells.add((i, j))
 
         # Add new sentence
-        new_sentence = Sentence(new_sentence_cells, count)
-        self.knowledge.append(new_sentence)
-
-        # Add additional knowledge
-        for sentence in self.knowledge:
-
-            sentence.mark_safe(cell)
-
-            # Update core knowledge with any info from sentences
-            self.safes.update(sentence.known_safes())
-            self.mines.update(sentence.known_mines())
-
-            # Add any sub-sentences that may be possible
-            if sentence.cells < new_sentence.cells or new_sentence.cells < sentence.cells:
-                sub = Sentence(sentence.cells.symmetric_difference(new_sentence.cells), abs(sentence.count - count))
-                if sub not in self.knowledge:
-                    self.knowledge.append(sub)
-                    self.safes.update(sub.known_safes())
-                    self.mines.update(sub.known_mines())
+        self.learn(Sentence(new_sentence_cells, count))
+        self.infer()
 
+    def infer(self):
+        """
+        Takes sentences off the worklist until it is empty or the work
+        limit is reached, marking the cells any of them decide, and
+        adding the sentences that follow from one being a subset of
+        another. Every sentence that is changed or learned along the
+        way goes back on the worklist.
+        """
+        work = 0
+        while self.pending and work < self.work_limit:
+            _, sentence = self.pending.popitem()
+            work += 1
+
+            # Sentences emptied or merged into another have nothing to add
+            if sentence not in self.knowledge:
+                continue
+
+            mines = sentence.known_mines().copy()
+            safes = sentence.known_safes().copy()
+            for cell in mines:
+                self.mark_mine(cell)
+            for cell in safes:
+                self.mark_safe(cell)
+            if mines or safes:
+                continue
+
+            # Add any sub-sentences that may be possible, which needs the
+            # other sentence to share a cell with this one
+            related = set()
+            for cell in sentence.cells:
+                related.update(self.index[cell])
+            work += len(related)
+            for other in related:
+                if other.cells < sentence.cells:
+                    self.learn(Sentence(sentence.cells - other.cells, sentence.count - other.count))
+                elif sentence.cells < other.cells:
+                    self.learn(Sentence(other.cells - sentence.cells, other.count - sentence.count))
 
     def make_safe_move(self):
         """
@@ -261,7 +342,12 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        If the AI knows how many mines there are, it chooses the cell
+        least likely to be a mine instead.
         """
+        if self.probabilities is not None:
+            return self.probabilities.safest(self)
 
         possible_cells = list(self.all_cells.difference(self.mines.union(self.moves_made)))
 
@@ -0,0 +1,324 @@
+"""
+Mine probabilities for Minesweeper
+
+Works out the chance that each unknown cell is a mine, given what
+MinesweeperAI knows and the number of mines on the board, by counting
+the mine configurations that are consistent with its knowledge.
+
+Cells mentioned by a sentence form the frontier, which splits into
+components that share no sentence and can be counted on their own.
+The other unknown cells, the interior, are unconstrained, and only
+the binomial coefficients of how many ways they can hold the mines
+left over are needed for them.
+"""
+
+import functools
+import math
+import random
+import sys
+import time
+
+
+class Timeout(Exception):
+    pass
+
+
+class Deadline():
+    """
+    Time by which, and number of search steps in which, the
+    probabilities must be worked out. Either may be None for no limit.
+    """
+
+    def __init__(self, end=None, steps=None):
+        self.end = end
+        self.steps = steps
+
+    def check(self):
+        """
+        Takes one step, raising Timeout if the time or steps are up.
+        """
+        if self.steps is not None:
+            self.steps -= 1
+            if self.steps < 0:
+                raise Timeout
+        if self.end is not None and time.perf_counter() > self.end:
+            raise Timeout
+
+
+@functools.lru_cache(maxsize=None)
+def combinations(n, k):
+    """
+    Returns the number of ways of choosing k of n cells, 0 if k is out
+    of range.
+    """
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
+
+
+def convolve(first, second):
+    """
+    Returns the distribution of the total number of mines of two
+    independent sets of cells, given each as a dict mapping a number
+    of mines to a number of configurations.
+    """
+    total = {}
+    for a, ways_a in first.items():
+        for b, ways_b in second.items():
+            total[a + b] = total.get(a + b, 0) + ways_a * ways_b
+    return total
+
+
+def components(sentences):
+    """
+    Returns the sentences split into lists that share no cell with
+    each other.
+    """
+    by_cell = {}
+    for sentence in sentences:
+        for cell in sentence.cells:
+            by_cell.setdefault(cell, []).append(sentence)
+
+    groups = []
+    seen = set()
+    for sentence in sentences:
+        if id(sentence) in seen:
+            continue
+        seen.add(id(sentence))
+        group = [sentence]
+        for member in group:
+            for cell in member.cells:
+                for other in by_cell[cell]:
+                    if id(other) not in seen:
+                        seen.add(id(other))
+                        group.append(other)
+        groups.append(group)
+    return groups
+
+
+def solve_component(constraints, deadline):
+    """
+    Counts the mine configurations of one component, given as a
+    frozenset of (cells, count) constraints.
+
+    Returns (cells, solutions), where `solutions` maps each possible
+    number of mines to (ways, mine_counts): the number of
+    configurations with that many mines, and how many of those have a
+    mine in each of `cells`, in order.
+    """
+
+    # Assign cells in the order constraints reach them, so that each
+    # constraint is decided, and prunes, as early as possible
+    constraints = sorted(constraints, key=lambda constraint: sorted(constraint[0]))
+    cells = []
+    placed = set()
+    for cell_set, _ in constraints:
+        for cell in sorted(cell_set - placed):
+            placed.add(cell)
+            cells.append(cell)
+    position = {cell: i for i, cell in enumerate(cells)}
+
+    # Each cell is a level of recursion
+    if len(cells) > sys.getrecursionlimit() // 2:
+        raise Timeout
+
+    touching = [[] for _ in cells]
+    need = []
+    left = []
+    for c, (cell_set, count) in enumerate(constraints):
+        for cell in cell_set:
+            touching[position[cell]].append(c)
+        need.append(count)
+        left.append(len(cell_set))
+
+    solutions = {}
+    assignment = [0] * len(cells)
+
+    def assign(i, mines):
+        deadline.check()
+        if i == len(cells):
+            solution = solutions.setdefault(mines, [0, [0] * len(cells)])
+            solution[0] += 1
+            mine_counts = solution[1]
+            for j, value in enumerate(assignment):
+                mine_counts[j] += value
+            return
+
+        for value in (0, 1):
+            consistent = True
+            for c in touching[i]:
+                left[c] -= 1
+                need[c] -= value
+                if need[c] < 0 or need[c] > left[c]:
+                    consistent = False
+            if consistent:
+                assignment[i] = value
+                assign(i + 1, mines + value)
+            for c in touching[i]:
+                left[c] += 1
+                need[c] += value
+        assignment[i] = 0
+
+    assign(0, 0)
+    return cells, {mines: (ways, mine_counts)
+                   for mines, (ways, mine_counts) in solutions.items()}
+
+
+class MineProbabilities():
+    """
+    Works out mine probabilities for a MinesweeperAI on a board with
+    `mines` mines, spending at most `time_budget` seconds and
+    `work_budget` search steps a move, either of which may be None.
+    Only a work budget gives the same moves however busy the machine.
+
+    The configurations of each component are kept from move to move,
+    keyed by its constraints, so only components that changed are
+    counted again.
+    """
+
+    def __init__(self, mines, time_budget=0.1, work_budget=None,
+                 cache_size=10000):
+        self.mines = mines
+        self.time_budget = time_budget
+        self.work_budget = work_budget
+        self.cache_size = cache_size
+        self.solutions = {}
+
+        # Number of moves chosen by `estimate` for want of time or work
+        self.fallbacks = 0
+
+        # Components that could not be counted in time, not to be tried
+        # again
+        self.too_large = set()
+
+    def solve(self, constraints, deadline):
+        """
+        Returns the solution of a component, from the cache if the same
+        constraints were solved before.
+        """
+        if constraints in self.too_large:
+            raise Timeout
+        if constraints not in self.solutions:
+            if len(self.solutions) >= self.cache_size:
+                self.solutions.clear()
+            try:
+                self.solutions[constraints] = solve_component(
+                    constraints, deadline)
+            except Timeout:
+                self.too_large.add(constraints)
+                raise
+        return self.solutions[constraints]
+
+    def probabilities(self, ai):
+        """
+        Returns a dict mapping every cell the AI has not revealed or
+        flagged to the probability that it is a mine.
+
+        Raises Timeout if the time or work budget runs out.
+        """
+        end = None
+        if self.time_budget is not None:
+            end = time.perf_counter() + self.time_budget
+        deadline = Deadline(end, self.work_budget)
+        safes = ai.safes - ai.moves_made
+        unknown = ai.all_cells - ai.moves_made - ai.mines - safes
+        remaining = self.mines - len(ai.mines)
+
+        solved = []
+        frontier = set()
+        for group in components(list(ai.knowledge)):
+            constraints = frozenset(
+                (frozenset(sentence.cells), sentence.count)
+                for sentence in group
+            )
+            cells, solutions = self.solve(constraints, deadline)
+            frontier.update(cells)
+            solved.append((cells, solutions))
+        interior = len(unknown - frontier)
+
+        # Distributions of the mines in the components before and after
+        # each one, so the rest of the board is known for every component
+        distributions = [{mines: ways for mines, (ways, _) in solutions.items()}
+                         for _, solutions in solved]
+        before = [{0: 1}]
+        for distribution in distributions:
+            before.append(convolve(before[-1], distribution))
+        after = [{0: 1}]
+        for distribution in reversed(distributions):
+            after.append(convolve(after[-1], distribution))
+        after.reverse()
+
+        # Every configuration of the frontier leaves the remaining mines
+        # to be spread over the interior
+        frontier_ways = before[-1]
+        total = sum(ways * combinations(interior, remaining - mines)
+                    for mines, ways in frontier_ways.items())
+        if total == 0:
+            raise Exception("knowledge is inconsistent with the mine count")
+
+        probabilities = dict.fromkeys(safes, 0)
+        if interior:
+            interior_mines = sum(
+                ways * combinations(interior, remaining - mines)
+                * (remaining - mines)
+                for mines, ways in frontier_ways.items()
+            )
+            share = interior_mines / (total * interior)
+            for cell in unknown - frontier:
+                probabilities[cell] = share
+
+        for c, (cells, solutions) in enumerate(solved):
+            others = convolve(before[c], after[c + 1])
+            counts = [0] * len(cells)
+            for mines, (ways, mine_counts) in solutions.items():
+                weight = sum(
+                    other_ways * combinations(
+                        interior, remaining - mines - other_mines)
+                    for other_mines, other_ways in others.items()
+                )
+                for i, count in enumerate(mine_counts):
+                    counts[i] += count * weight
+            for cell, count in zip(cells, counts):
+                probabilities[cell] = count / total
+        return probabilities
+
+    def safest(self, ai):
+        """
+        Returns the cell least likely to be a mine, chosen at random
+        among equally likely cells, or None if there are no cells left.
+
+        If the time or work budget runs out, estimates each frontier
+        cell's probability by its most dangerous sentence instead.
+        """
+        try:
+            probabilities = self.probabilities(ai)
+        except Timeout:
+            self.fallbacks += 1
+            probabilities = self.estimate(ai)
+        if not probabilities:
+            return None
+        lowest = min(probabilities.values())
+        return random.choice(sorted(
+            cell for cell, p in probabilities.items() if p == lowest))
+
+    def estimate(self, ai):
+        """
+        Returns rough mine probabilities for when counting takes too
+        long: the highest share of mines among the sentences mentioning
+        a frontier cell, and the density of the mines left elsewhere.
+        Cells known to be safe have no chance of being mines.
+        """
+        safes = ai.safes - ai.moves_made
+        unknown = ai.all_cells - ai.moves_made - ai.mines - safes
+        probabilities = dict.fromkeys(safes, 0)
+        for sentence in ai.knowledge:
+            share = sentence.count / len(sentence.cells)
+            for cell in sentence.cells:
+                probabilities[cell] = max(probabilities.get(cell, 0), share)
+
+        interior = unknown - set(probabilities)
+        if interior:
+            share = max(0, self.mines - len(ai.mines)) / len(unknown)
+            for cell in interior:
+                probabilities[cell] = share
+        return probabilities
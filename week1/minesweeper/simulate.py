@@ -0,0 +1,85 @@
+import multiprocessing
+import sys
+import time
+
+from benchmark import percentile, play
+
+# Board configurations played when none are given: the runner's board
+# and the classic beginner, intermediate and expert boards
+configurations = [(8, 8, 8), (9, 9, 10), (16, 16, 40), (16, 30, 99)]
+
+
+def simulate(game):
+    """
+    Plays one game, given as (height, width, mines, seed), returning
+    (won, latencies, random_moves, fallbacks).
+    """
+    won, latencies, _, random_moves, fallbacks, _ = play(*game)
+    return won, latencies, random_moves, fallbacks
+
+
+def run(height, width, mines, games, workers=1, seed=0):
+    """
+    Plays `games` games on one board configuration, seeded from `seed`
+    onwards, spread over `workers` forked processes.
+    Returns the results of the games in order, and the seconds taken.
+    """
+    tasks = [(height, width, mines, seed + i) for i in range(games)]
+    start = time.perf_counter()
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        results = [simulate(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            chunk = max(1, games // (4 * workers))
+            results = pool.map(simulate, tasks, chunksize=chunk)
+    return results, time.perf_counter() - start
+
+
+def report(height, width, mines, results, elapsed):
+    """
+    Prints the win rate, move throughput and move latencies of a run,
+    and how many random moves fell back to an estimate.
+    """
+    wins = sum(won for won, _, _, _ in results)
+    latencies = sorted(latency for _, moves, _, _ in results
+                       for latency in moves)
+    guesses = sum(random_moves for _, _, random_moves, _ in results)
+    estimates = sum(fallbacks for _, _, _, fallbacks in results)
+    thinking = sum(latencies)
+
+    print(f"{height}x{width} with {mines} mines: "
+          f"{wins}/{len(results)} won ({wins / len(results):.1%}), "
+          f"{len(results) / elapsed:.1f} games/s")
+    if not latencies:
+        return
+    print(f"    {len(latencies)} moves, {len(latencies) / thinking:.0f} "
+          f"moves/s, {guesses / len(latencies):.2%} random, "
+          f"{estimates} estimated")
+    print("    latency " + ", ".join(
+        f"{name} {percentile(latencies, fraction) * 1e6:.0f}us"
+        for name, fraction in [("p50", 0.5), ("p90", 0.9),
+                               ("p99", 0.99), ("p99.9", 0.999)]
+    ) + f", max {latencies[-1] * 1e6:.0f}us")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python simulate.py games [workers] [seed] "
+                 "[height,width,mines ...]")
+    games = int(sys.argv[1])
+    workers = multiprocessing.cpu_count()
+    if len(sys.argv) > 2:
+        workers = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    boards = configurations
+    if len(sys.argv) > 4:
+        boards = [tuple(int(n) for n in arg.split(",")) for arg in sys.argv[4:]]
+
+    for height, width, mines in boards:
+        results, elapsed = run(height, width, mines, games, workers, seed)
+        report(height, width, mines, results, elapsed)
+
+
+if __name__ == "__main__":
+    main()